@@ -0,0 +1,219 @@
+"""Monte Carlo rollouts for many simulated games at once using NumPy.
+
+Each simulated game is a row in a set of arrays: a card-count matrix per player
+hand and for the discard pile below the top card (columns are card ids, see
+game_engine.CARDS), and a draw pile that is shuffled lazily, one Fisher-Yates
+swap per card drawn. All games
+advance in lockstep, one turn per step, following the same rules as
+Strategy.random_rollout: the player to move plays a random playable card, or
+draws one if nothing is playable.
+
+Every rollout shuffles the draw pile itself rather than using the real game's
+deck order, and for a DeterminizedState also deals the other hands afresh.
+"""
+import numpy as np
+
+from game_engine import (PLAYABLE, NUM_CARD_IDS, NO_COLOR, WILD_ID, FACES_PER_COLOR, DEFAULT_ROLLOUT_DEPTH,
+                         EVALUATION_WEIGHTS, DeterminizedState)
+
+# Count matrices are padded to 56 columns so each row is exactly seven uint64
+# words, which _sample uses to prefix-sum eight counts per multiply.
+COLUMNS = 56
+PLAYABLE_MASK = np.zeros((len(PLAYABLE), COLUMNS), dtype=np.uint8)
+PLAYABLE_MASK[:, :NUM_CARD_IDS] = np.frombuffer(b"".join(PLAYABLE), dtype=np.uint8).reshape(len(PLAYABLE), NUM_CARD_IDS)
+# Row of PLAYABLE_MASK for a non-wild top card; wild cards add the chosen colour.
+_BASE_KEY = np.array([cid * (NO_COLOR + 1) + (0 if cid >= WILD_ID else cid // FACES_PER_COLOR)
+                      for cid in range(NUM_CARD_IDS)])
+DECK_SIZE = 108
+SPECIAL_COLUMNS = np.array([cid for cid in range(WILD_ID) if cid % FACES_PER_COLOR >= 10])
+
+
+_BYTES = np.uint64(0x0101010101010101)
+
+
+def _counts(card_ids):
+    return np.bincount(np.asarray(card_ids, dtype=np.intp), minlength=COLUMNS).astype(np.uint8)
+
+
+def _sample(counts, rng):
+    """Pick one card id per row of a (games, COLUMNS) uint8 count matrix,
+    with probability proportional to the counts. Returns (choices, row totals).
+
+    The running totals are computed eight bytes at a time: multiplying a
+    little-endian uint64 by 0x0101010101010101 leaves the prefix sum of its
+    bytes in each byte. The same trick applied to the seven word totals gives
+    the offset to add to each word. No total exceeds the 108-card deck, so
+    bytes never carry.
+    """
+    games = len(counts)
+    prefix = counts.view(np.uint64) * _BYTES
+    prefix_bytes = prefix.view(np.uint8)
+    word_totals = np.zeros((games, 8), dtype=np.uint8)
+    word_totals[:, 1:] = prefix_bytes[:, 7::8]
+    offsets = (word_totals.view(np.uint64)[:, 0] * _BYTES).view(np.uint8).reshape(games, 8)
+    totals = offsets[:, 7]
+    prefix += offsets[:, :7].astype(np.uint64) * _BYTES
+    targets = (rng.random(games) * totals).astype(np.uint8)
+    return (prefix_bytes > targets[:, None]).argmax(axis=1), totals
+
+
+class RolloutBatch:
+    """Arrays for a batch of simulated games, one row per game."""
+
+    def draw(self, rows, rng):
+        """Draw a uniformly random card from the remaining draw pile of each game."""
+        pos = self.deck_pos[rows]
+        pick = pos + (rng.random(len(rows)) * (self.deck_len[rows] - pos)).astype(np.intp)
+        drawn = self.deck[rows, pick]
+        self.deck[rows, pick] = self.deck[rows, pos]
+        self.deck_pos[rows] = pos + 1
+        return drawn
+
+    def __init__(self, hands, deck, deck_pos, deck_len, discard, top, keys, sizes, game_index):
+        self.hands = hands
+        self.deck = deck
+        self.deck_pos = deck_pos
+        self.deck_len = deck_len
+        self.discard = discard
+        self.top = top
+        self.keys = keys
+        self.sizes = sizes
+        self.game_index = game_index
+
+    def compact(self, keep):
+        return RolloutBatch(self.hands[keep], self.deck[keep], self.deck_pos[keep], self.deck_len[keep],
+                            self.discard[keep], self.top[keep], self.keys[keep], self.sizes[keep],
+                            self.game_index[keep])
+
+    def reshuffle(self, rows):
+        """Turn the discard pile of the given games into their draw pile."""
+        card_ids = np.arange(COLUMNS)
+        for row in rows:
+            cards = np.repeat(card_ids, self.discard[row])
+            self.deck[row, :len(cards)] = cards
+            self.deck_pos[row] = 0
+            self.deck_len[row] = len(cards)
+            self.discard[row] = 0
+
+
+def _top_keys(top, rng):
+    """PLAYABLE_MASK rows for new top cards, choosing a random colour for wilds."""
+    keys = _BASE_KEY[top]
+    wild = top >= WILD_ID
+    keys[wild] += rng.integers(0, NO_COLOR, np.count_nonzero(wild))
+    return keys
+
+
+def _initial_batch(state, seat, card_ids, simulations, rng):
+    player_ids = state.player_ids
+    batch = len(card_ids) * simulations
+
+    hands = np.stack([_counts(state.hands[pid]) for pid in player_ids])
+    hands = np.repeat(hands[None, :, :], batch, axis=0)
+    deck = np.zeros((batch, DECK_SIZE), dtype=np.uint8)
+    deck[:, :len(state.deck)] = np.asarray(state.deck, dtype=np.uint8)
+    discard = np.repeat(_counts(state.discard[:-1])[None, :], batch, axis=0)
+    discard[:, state.discard[-1]] += 1
+
+    if isinstance(state, DeterminizedState):
+        # Deal the unseen cards to the other hands and the deck separately in every row.
+        rows = np.arange(batch)[:, None]
+        pool = np.asarray(state.unseen, dtype=np.uint8)
+        dealt = pool[np.argsort(rng.random((batch, len(pool))), axis=1)]
+        start = 0
+        for seat_index, pid in enumerate(player_ids):
+            if pid != state.observer:
+                size = len(state.hands[pid])
+                hands[:, seat_index] = 0
+                np.add.at(hands[:, seat_index], (rows, dealt[:, start:start + size]), 1)
+                start += size
+        deck[:, :len(pool) - start] = dealt[:, start:]
+
+    # The rollout player's first move is the candidate card being scored.
+    first = np.repeat(np.asarray(card_ids, dtype=np.intp), simulations)
+    hands[np.arange(batch), seat, first] -= 1
+
+    return RolloutBatch(
+        hands,
+        deck,
+        np.zeros(batch, dtype=np.intp),
+        np.full(batch, len(state.deck), dtype=np.intp),
+        discard,
+        first,
+        _top_keys(first, rng),
+        hands.sum(axis=2, dtype=np.int16),
+        np.arange(batch),
+    )
+
+
+def heuristic_scores(b, seat):
+    """Vectorised game_engine.heuristic_evaluation for every game in a batch."""
+    sizes = b.sizes.astype(np.float64)
+    closest = np.delete(sizes, seat, axis=1).min(axis=1)
+    hand = b.hands[:, seat]
+    specials = hand[:, SPECIAL_COLUMNS].sum(axis=1)
+    wilds = hand[:, WILD_ID:NUM_CARD_IDS].sum(axis=1)
+    lead_weight, special_weight, wild_weight = EVALUATION_WEIGHTS
+    score = lead_weight * (closest - sizes[:, seat]) + special_weight * specials + wild_weight * wilds
+    return 1.0 / (1.0 + np.exp(-score))
+
+
+def batch_rollout_wins(state, player_id, card_ids, simulations, max_depth=DEFAULT_ROLLOUT_DEPTH, rng=None):
+    """Play `simulations` rollouts for each card id in lockstep; return the summed score per card.
+
+    `state` is a GameState with `player_id` to move. A win scores 1 and a
+    loss 0; rollouts still running after max_depth turns are scored with
+    heuristic_scores.
+    """
+    rng = np.random.default_rng(rng)
+    num_players = len(state.player_ids)
+    seat = state.player_ids.index(player_id)
+    b = _initial_batch(state, seat, card_ids, simulations, rng)
+
+    wins = np.zeros(len(b.top))
+    wins[b.sizes[:, seat] == 0] = 1.0
+    active = b.sizes[:, seat] != 0
+
+    for turn in range(max_depth):
+        # Finished games keep stepping with the rest until enough of them
+        # pile up to be worth copying the arrays without them.
+        live = np.count_nonzero(active)
+        if not live:
+            break
+        if live < len(active) * 3 // 4:
+            b = b.compact(active)
+            active = np.ones(live, dtype=bool)
+
+        current = (seat + 1 + turn) % num_players
+        hand = b.hands[:, current]
+        chosen, totals = _sample(hand * PLAYABLE_MASK[b.keys], rng)
+
+        players = np.flatnonzero(totals)
+        if len(players):
+            chosen = chosen[players]
+            hand[players, chosen] -= 1
+            b.sizes[players, current] -= 1
+            b.discard[players, b.top[players]] += 1
+            b.top[players] = chosen
+            b.keys[players] = _top_keys(chosen, rng)
+
+        drawers = np.flatnonzero(totals == 0)
+        if len(drawers):
+            empty = drawers[b.deck_pos[drawers] == b.deck_len[drawers]]
+            if len(empty):
+                b.reshuffle(empty)
+                drawers = drawers[b.deck_pos[drawers] < b.deck_len[drawers]]
+            drawn = b.draw(drawers, rng)
+            hand[drawers, drawn] += 1
+            b.sizes[drawers, current] += 1
+
+        finished = active & (b.sizes[:, current] == 0)
+        if finished.any():
+            if current == seat:
+                wins[b.game_index[finished]] = 1.0
+            active &= ~finished
+    else:
+        if active.any():
+            wins[b.game_index[active]] = heuristic_scores(b, seat)[active]
+
+    return wins.reshape(len(card_ids), simulations).sum(axis=1)
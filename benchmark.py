@@ -0,0 +1,399 @@
+"""Micro-benchmarks for the engine, the bot strategies and the GUI renderer.
+
+    python -m benchmark --output before.json
+    python -m benchmark --baseline before.json
+
+Results are printed as JSON. With --baseline, every metric is compared with the
+saved run and the exit status is 1 if any got worse by more than --threshold.
+Metrics ending in _per_second are better when higher; everything else is a
+time and better when lower.
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from game_engine import Game, GameState, Strategy, Hand, NUMPY_MIN_BATCH, CARDS, DECK_IDS, MAX_SEATS
+
+HAND_SIZES = (3, 7, 15, 30)
+TABLE_SIZES = (2, 4, 6, MAX_SEATS)
+
+# Run in a fresh interpreter by bench_startup; prints import seconds, peak RSS
+# in KiB (where the resource module exists) and whether pandas got imported.
+_STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import game_engine
+seconds = time.perf_counter() - started
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    rss = 0
+print(json.dumps([seconds, rss, "pandas" in sys.modules]))
+"""
+
+
+def _time_calls(fn, calls):
+    """Call fn `calls` times and return the per-call times in seconds."""
+    times = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def _percentile(times, q):
+    ordered = sorted(times)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _latency(times):
+    return {
+        "p50_ms": _percentile(times, 0.50) * 1000,
+        "p99_ms": _percentile(times, 0.99) * 1000,
+    }
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds else 0.0
+
+
+def _dealt_game(hand_size, difficulty=1, **options):
+    game = Game(num_players=1, difficulty=difficulty, **options)
+    game.game_setup(hand_size=hand_size)
+    return game
+
+
+def bench_create_deck(scale):
+    game = Game()
+    calls = 2000 * scale
+    times = _time_calls(game.create_deck, calls)
+    return {"calls_per_second": _rate(calls, sum(times)), **_latency(times)}
+
+
+def bench_game_setup(scale):
+    calls = 1000 * scale
+    times = _time_calls(lambda: _dealt_game(7), calls)
+    return {"calls_per_second": _rate(calls, sum(times)), **_latency(times)}
+
+
+def bench_bot_turn(scale):
+    """Priority bot turns from fresh games until `turns` have been played."""
+    turns = 0
+    target = 5000 * scale
+    seconds = 0.0
+    while turns < target:
+        game = _dealt_game(7, difficulty=2)
+        started = time.perf_counter()
+        while game.winner is None and turns < target:
+            game.bot_turn(game.current_player)
+            turns += 1
+        seconds += time.perf_counter() - started
+    return {"turns_per_second": _rate(turns, seconds)}
+
+
+def bench_table(scale):
+    """Priority bot turns/second at tables of 2 to MAX_SEATS seats, to check turn order stays O(1)."""
+    results = {}
+    for seats in TABLE_SIZES:
+        turns = 0
+        target = 5000 * scale
+        seconds = 0.0
+        while turns < target:
+            game = Game(seats={pid: 2 for pid in range(seats)})
+            game.game_setup(hand_size=7)
+            started = time.perf_counter()
+            while game.winner is None and turns < target:
+                game.bot_turn(game.current_player)
+                turns += 1
+            seconds += time.perf_counter() - started
+        results[f"seats{seats}"] = {"turns_per_second": _rate(turns, seconds)}
+    return results
+
+
+def bench_player_turn(scale):
+    """Human turns fed the first playable card (or a draw), as the CLI would."""
+    turns = 0
+    target = 5000 * scale
+    seconds = 0.0
+    while turns < target:
+        game = _dealt_game(7)
+        game.current_player = 0
+        started = time.perf_counter()
+        while game.winner is None and turns < target:
+            if game.current_player == 0:
+                card = next((card for card in game.players[0].hand if game.is_playable(card)), None)
+                game.player_turn(0, card)
+            else:
+                game.bot_turn(game.current_player)
+            turns += 1
+        seconds += time.perf_counter() - started
+    return {"turns_per_second": _rate(turns, seconds)}
+
+
+def bench_step(scale):
+    """Headless Game.step loop taking the first legal action of each mask."""
+    steps = 0
+    target = 20000 * scale
+    seconds = 0.0
+    while steps < target:
+        game = _dealt_game(7)
+        started = time.perf_counter()
+        while game.winner is None and steps < target:
+            game.step(game.legal_actions().find(1))
+            steps += 1
+        seconds += time.perf_counter() - started
+    return {"steps_per_second": _rate(steps, seconds)}
+
+
+def bench_snapshot(scale):
+    """Game.to_bytes/from_bytes and GameState.to_bytes/from_bytes against pickle: size and calls/second.
+
+    Also times Game.determinized() and dealing one world from it.
+    """
+    game = Game(seats={pid: 2 for pid in range(4)}, seed=0)
+    game.game_setup(hand_size=7)
+    for _ in range(20):
+        if game.winner is None:
+            game.bot_turn(game.current_player)
+    state = game.snapshot()
+    calls = 2000 * scale
+    results = {}
+    for name, obj, cls in (("game", game, Game), ("state", state, GameState)):
+        data = obj.to_bytes()
+        pickled = pickle.dumps(obj)
+        results[f"{name}_bytes"] = {
+            "size_bytes": len(data),
+            "encode_per_second": _rate(calls, sum(_time_calls(obj.to_bytes, calls))),
+            "decode_per_second": _rate(calls, sum(_time_calls(lambda: cls.from_bytes(data), calls))),
+        }
+        results[f"{name}_pickle"] = {
+            "size_bytes": len(pickled),
+            "encode_per_second": _rate(calls, sum(_time_calls(lambda: pickle.dumps(obj), calls))),
+            "decode_per_second": _rate(calls, sum(_time_calls(lambda: pickle.loads(pickled), calls))),
+        }
+    determinized = game.determinized()
+    results["determinized"] = {
+        "build_per_second": _rate(calls, sum(_time_calls(game.determinized, calls))),
+        "deal_per_second": _rate(calls, sum(_time_calls(determinized.clone, calls))),
+    }
+    return results
+
+
+def bench_vector_env(scale):
+    """UnoVectorEnv agent steps/second with random legal actions against the priority bot."""
+    try:
+        import numpy as np
+        from vector_env import UnoVectorEnv, random_actions
+    except ImportError as exc:
+        return {"skipped": str(exc)}
+    results = {}
+    for num_envs in (1, 64):
+        env = UnoVectorEnv(num_envs, seed=0)
+        obs = env.reset()
+        rng = np.random.default_rng(0)
+        steps = 2000 * scale // num_envs + 1
+        started = time.perf_counter()
+        for _ in range(steps):
+            obs, rewards, dones = env.step(random_actions(obs["legal"], rng))
+        results[f"envs{num_envs}"] = {"steps_per_second": _rate(steps * num_envs, time.perf_counter() - started)}
+    return results
+
+
+def bench_strategies(scale):
+    """Decision latency of each Strategy method at a few hand sizes."""
+    results = {}
+    calls = 500 * scale
+    rng = random.Random(0)
+    deck = [CARDS[cid] for cid in DECK_IDS]
+    for hand_size in HAND_SIZES:
+        positions = []
+        for _ in range(calls):
+            cards = rng.sample(deck, hand_size + 1)
+            positions.append((Hand(cards[1:]), cards[0], rng.choice(("Red", "Green", "Blue", "Yellow"))))
+        for name in ("choose_random_card", "choose_with_priority"):
+            method = getattr(Strategy, name)
+            it = iter(positions)
+            times = _time_calls(lambda: method(*next(it)), calls)
+            results[f"{name}_hand{hand_size}"] = _latency(times)
+
+        game = _dealt_game(hand_size, difficulty=3, simulations=10)
+        times = _time_calls(lambda: Strategy.monte_carlo_card(game, 100, simulations=10), 5 * scale)
+        results[f"monte_carlo_card_hand{hand_size}"] = _latency(times)
+    return results
+
+
+def bench_rollouts(scale):
+    """Rollouts/second behind a difficulty 3 decision, per engine and allocation.
+
+    The numpy engine gets NUMPY_MIN_BATCH simulations per card so it isn't
+    handed to the python engine. Each engine makes one short untimed
+    decision first, so imports and first-call setup aren't timed.
+    """
+    results = {}
+    engines = [("python", "uniform"), ("python", "halving"), ("python", "ucb")]
+    try:
+        import numpy  # noqa: F401
+        engines.append(("numpy", "uniform"))
+    except ImportError:
+        pass
+    for engine, allocation in engines:
+        simulations = (NUMPY_MIN_BATCH if engine == "numpy" else 50) * scale
+        random.seed(1)
+        game = _dealt_game(7, difficulty=3)
+        Strategy.monte_carlo_stats(game, 100, simulations=simulations, engine=engine, allocation=allocation,
+                                   max_depth=1)
+        started = time.perf_counter()
+        stats = Strategy.monte_carlo_stats(game, 100, simulations=simulations, engine=engine, allocation=allocation)
+        seconds = time.perf_counter() - started
+        rollouts = sum(visits for wins, visits in stats.values())
+        results[f"{engine}_{allocation}"] = {"rollouts_per_second": _rate(rollouts, seconds)}
+    return results
+
+
+def bench_draw_hand(scale):
+    """Frame cost of gui_game.draw_hand for the player's and the bot's hand."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    try:
+        import gui_game
+    except ImportError as exc:
+        return {"skipped": str(exc)}
+    gui_game.load_sprites()
+    hand = [CARDS[cid] for cid in DECK_IDS[:7]]
+    frames = 500 * scale
+
+    def frame():
+        gui_game.draw_hand(hand, gui_game.HAND_Y, selected_idx=0)
+        gui_game.draw_hand(hand, gui_game.BOT_HAND_Y, hide_cards=True)
+
+    times = _time_calls(frame, frames)
+    return {"frames_per_second": _rate(frames, sum(times)), **_latency(times)}
+
+
+def bench_startup(scale):
+    """Time and peak RSS of `import game_engine` in a fresh interpreter."""
+    times, rss = [], []
+    for _ in range(5 * scale):
+        out = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        seconds, peak, pandas_loaded = json.loads(out.stdout)
+        times.append(seconds)
+        rss.append(peak)
+    return {"import_ms": _percentile(times, 0.5) * 1000, "peak_rss_kb": max(rss), "imports_pandas": int(pandas_loaded)}
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "create_deck": bench_create_deck,
+    "game_setup": bench_game_setup,
+    "bot_turn": bench_bot_turn,
+    "table": bench_table,
+    "player_turn": bench_player_turn,
+    "step": bench_step,
+    "snapshot": bench_snapshot,
+    "vector_env": bench_vector_env,
+    "strategies": bench_strategies,
+    "rollouts": bench_rollouts,
+    "draw_hand": bench_draw_hand,
+}
+
+
+def run_benchmarks(names=None, scale=1, seed=0):
+    """Run the named benchmarks (all by default) and return a JSON-ready dict."""
+    names = names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark {name!r}, expected one of {sorted(BENCHMARKS)}")
+    random.seed(seed)
+    results = {name: BENCHMARKS[name](scale) for name in names}
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "results": results,
+    }
+
+
+def _flatten(results, prefix=""):
+    metrics = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            metrics.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            metrics[prefix + key] = value
+    return metrics
+
+
+def compare(current, baseline, threshold=0.1):
+    """Compare two run_benchmarks results metric by metric.
+
+    Returns a list of {"metric", "baseline", "current", "change", "regression"}
+    rows; change is the relative improvement (positive is better) and a row is
+    a regression when change < -threshold. A metric whose baseline is 0 (a
+    count or flag such as imports_pandas) has no relative change: moving off
+    0 counts as a change of 1.0, and is always a regression for metrics where
+    lower is better.
+    """
+    now = _flatten(current["results"])
+    before = _flatten(baseline["results"])
+    rows = []
+    for metric in sorted(now.keys() & before.keys()):
+        old, new = before[metric], now[metric]
+        higher_is_better = metric.endswith("_per_second")
+        if old:
+            change = (new - old) / old
+        else:
+            change = float(new != 0)
+        if not higher_is_better:
+            change = -change
+        rows.append({
+            "metric": metric,
+            "baseline": old,
+            "current": new,
+            "change": change,
+            "regression": change < -threshold or (not old and new > 0 and not higher_is_better),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the UNO engine, strategies and renderer.")
+    parser.add_argument("benchmarks", nargs="*", help=f"subset to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--scale", type=int, default=1, help="multiply the work done by every benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="also write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown reported as a regression (default 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.benchmarks, scale=args.scale, seed=args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if not args.baseline:
+        print(json.dumps(current, indent=2))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    print(json.dumps({"current": current, "comparison": rows}, indent=2))
+    regressions = [row["metric"] for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,7 @@ def print_hand(player):
     for idx, card in enumerate(player.hand):
         print(f"  {idx + 1}: {card}")
 
-def get_player_move(player, top_card):
+def get_player_move(player, top_card, color=None):
     print(f"Top card: {top_card}")
     print_hand(player)
     while True:
@@ -16,7 +16,7 @@ def get_player_move(player, top_card):
             idx = int(move) - 1
             if 0 <= idx < len(player.hand):
                 card = player.hand[idx]
-                if card.is_playable_on(top_card):
+                if card.is_playable_on(top_card, color):
                     return card
                 else:
                     print("You can't play that card.")
@@ -25,101 +25,69 @@ def get_player_move(player, top_card):
         else:
             print("Invalid input.")
 
+def choose_color():
+    color = input("Choose a color (Red, Green, Blue, Yellow): ").strip().capitalize()
+    while color not in COLORS:
+        color = input("Invalid color. Choose (Red, Green, Blue, Yellow): ").strip().capitalize()
+    return color
+
+def print_effects(result, target, target_turn):
+    if result["force_draw"]:
+        print(f"{target} {result['force_draw']} cards!")
+    elif result["skipped"] is not None:
+        print(f"{target_turn} skipped!")
+
 def main():
     print("Welcome to CLI Uno!")
     num_players = 1
     difficulty = 1
     while True:
         try:
-            difficulty = int(input("Choose bot difficulty (1: Random, 2: Smart): "))
-            if difficulty in [1, 2]:
+            difficulty = int(input("Choose bot difficulty (1: Random, 2: Smart, 3: Monte Carlo): "))
+            if difficulty in [1, 2, 3]:
                 break
         except ValueError:
             pass
-        print("Invalid input. Please enter 1 or 2.")
+        print("Invalid input. Please enter 1, 2 or 3.")
 
     game = Game(num_players=num_players, difficulty=difficulty)
     game.game_setup()
     player = game.players[0]
-    bot = game.players[100]
-    turn = 0
 
-    while True:
-        game.reshuffle_deck()
+    while game.winner is None:
         top_card = game.discard_pile[-1]
         print("\n--- New Turn ---")
-        print(f"Top card: {top_card}")
-        if turn == 0:
-            playable = any(card.is_playable_on(top_card) for card in player.hand)
-            if playable:
-                card = get_player_move(player, top_card)
-                if card:
-                    player.play_card(card)
-                    game.discard_pile.append(card)
-
-                    if card.special in ["Wild", "Wild Draw Four"]:
-                        color = input("Choose a color (Red, Green, Blue, Yellow): ").strip().capitalize()
-                        while color not in ["Red", "Green", "Blue", "Yellow"]:
-                            color = input("Invalid color. Choose (Red, Green, Blue, Yellow): ").strip().capitalize()
-                        game.wild_card_color_choice(0, color)
-                    effect = game.special_cards(card)
-                    if effect["Force Draw"]:
-                        print(f"Bot draws {effect['Force Draw']} cards!")
-                        game.force_draw_cards(100, effect["Force Draw"])
-                    if effect["Skip"]:
-                        print("Bot's turn skipped!")
-                        turn = 0
-                        continue
-                else:
-                    if not game.deck:
-                        game.reshuffle_deck()
-                    drawn = game.deck.pop()
-                    print(f"You drew: {drawn}")
-                    player.draw_card(drawn)
+        if game.current_player == 0:
+            if any(game.legal_actions()[:DRAW_ACTION]):
+                card = get_player_move(player, top_card, game.wild_color)
             else:
+                print(f"Top card: {top_card}")
                 print("No playable cards. Drawing a card...")
-                if not game.deck:
-                    game.reshuffle_deck()
-                drawn = game.deck.pop()
-                print(f"You drew: {drawn}")
-                player.draw_card(drawn)
-            if not player.hand:
-                print("Congratulations! You win!")
-                break
-            turn = 1
+                card = None
+            if card is None:
+                result = game.step(DRAW_ACTION)
+                print(f"You drew: {result['card']}")
+                continue
+            result = game.step(card.id)
+            if game.pending_color is not None:
+                result = game.step(COLOR_ACTIONS[COLOR_INDEX[choose_color()]])
+            print_effects(result, "Bot draws", "Bot's turn")
         else:
-            
+            print(f"Top card: {top_card}")
             print("Bot's turn...")
-            before = len(bot.hand)
             result = game.bot_turn(100)
-            after = len(bot.hand)
-            if before == after:
-                
-                if not game.deck:
-                    game.reshuffle_deck()
-                drawn = game.deck.pop()
-                bot.draw_card(drawn)
+            if result["action"] == "draw":
                 print("Bot drew a card.")
-            else:
-                played_card = game.discard_pile[-1]
-                print(f"Bot played: {played_card}")
-                
-                if played_card.special in ["Wild", "Wild Draw Four"]:
-                    game.wild_card_color_choice(100)
-                    print(f"Bot chose color: {game.discard_pile[-1].color}")
-                
-                effect = game.special_cards(played_card)
-                if effect["Force Draw"]:
-                    print(f"You draw {effect['Force Draw']} cards!")
-                    game.force_draw_cards(0, effect["Force Draw"])
-                if effect["Skip"]:
-                    print("Your turn is skipped!")
-                    turn = 1
-                    continue
-            if not bot.hand:
-                print("Bot wins! Better luck next time.")
-                break
-            turn = 0
+                continue
+            print(f"Bot played: {result['card']}")
+            if result["color"]:
+                print(f"Bot chose color: {result['color']}")
+            print_effects(result, "You draw", "Your turn is")
+
+    if game.winner == 0:
+        print("Congratulations! You win!")
+    else:
+        print("Bot wins! Better luck next time.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,191 @@
+"""Generate self-play training data as memory-mapped .npy shards.
+
+    python -m dataset data/ --shards 100 --shard-rows 100000 --mix random:1,priority:2 --workers 4
+
+Bot-vs-bot games are played with strategies drawn from --mix for each seat.
+Every bot decision becomes one row of a structured array:
+
+    features   int16[NUM_FEATURES]  features.state_features of the deciding player
+    action     int16                card id played, or DRAW_ACTION
+    outcome    int8                 +1 if the deciding player won the game, -1 if they lost, 0 if unfinished
+    strategy   int8                 index into the manifest's "strategies" of the deciding bot
+    game       int32                game number within the shard
+
+Each shard holds exactly shard_rows rows (the last game's extra decisions are
+dropped) and is written to a temporary file that is renamed into place when
+complete. Shard i is always generated from the same seeds, so shards can be
+built in parallel and a rerun with the same options skips the shards already
+listed in manifest.json. Read the shards back with load_shards(), which
+memory-maps them rather than loading them into RAM.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from features import FEATURE_NAMES, NUM_FEATURES, state_features
+from game_engine import Game, DRAW_ACTION
+from simulate import STRATEGIES, SEATS
+
+ROW_DTYPE = np.dtype([
+    ("features", np.int16, (NUM_FEATURES,)),
+    ("action", np.int16),
+    ("outcome", np.int8),
+    ("strategy", np.int8),
+    ("game", np.int32),
+])
+MANIFEST = "manifest.json"
+
+
+def parse_mix(text):
+    """'random:1,priority:2' -> {"random": 1.0, "priority": 2.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition(":")
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {name!r}, expected one of {sorted(STRATEGIES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def shard_name(index):
+    return f"shard-{index:06d}.npy"
+
+
+def play_decisions(mix, seed, hand_size=7, simulations=50, max_turns=1000):
+    """Play one game; return its decisions as (features, action, player id, strategy index) and the winner."""
+    names = list(mix)
+    chosen = random.Random(seed).choices(names, weights=list(mix.values()), k=len(SEATS))
+    strategies = dict(zip(SEATS, chosen))
+
+    game = Game(num_players=1, simulations=simulations, seed=seed)
+    game.game_setup(hand_size=hand_size)
+    decisions = []
+    while game.winner is None and len(decisions) < max_turns:
+        player_id = game.current_player
+        features = state_features(game, player_id)
+        card = game.choose_bot_card(player_id, STRATEGIES[strategies[player_id]])
+        decisions.append((features, card.id if card else DRAW_ACTION, player_id, names.index(strategies[player_id])))
+        game.player_turn(player_id, card)
+    if game.winner is None:
+        game.abandon()
+    return decisions, game.winner
+
+
+def build_shard(directory, index, shard_rows, mix, seed, hand_size=7, simulations=50, max_turns=1000):
+    """Generate shard `index` into directory and return its manifest entry."""
+    final = os.path.join(directory, shard_name(index))
+    partial = final + ".partial"
+    rows = np.lib.format.open_memmap(partial, mode="w+", dtype=ROW_DTYPE, shape=(shard_rows,))
+    filled = 0
+    games = 0
+    while filled < shard_rows:
+        decisions, winner = play_decisions(mix, f"{seed}-{index}-{games}", hand_size, simulations, max_turns)
+        take = decisions[:shard_rows - filled]
+        if take:
+            features, actions, player_ids, strategies = zip(*take)
+            block = rows[filled:filled + len(take)]
+            block["features"] = np.stack(features)
+            block["action"] = actions
+            if winner is not None:
+                block["outcome"] = np.where(np.array(player_ids) == winner, 1, -1)
+            block["strategy"] = strategies
+            block["game"] = games
+        filled += len(take)
+        games += 1
+    rows.flush()
+    del rows
+    os.replace(partial, final)
+    return {"index": index, "file": shard_name(index), "rows": shard_rows, "games": games}
+
+
+def _build_shard(args):
+    return build_shard(*args)
+
+
+def _write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def generate(directory, shards, shard_rows=100_000, mix=None, seed=0, workers=None, hand_size=7,
+             simulations=50, max_turns=1000):
+    """Build shards 0..shards-1 in directory, skipping those a previous run finished; return the manifest."""
+    mix = mix or {"random": 1.0, "priority": 1.0}
+    os.makedirs(directory, exist_ok=True)
+    config = {"shard_rows": shard_rows, "mix": mix, "seed": seed, "hand_size": hand_size,
+              "simulations": simulations, "max_turns": max_turns}
+    manifest = {
+        "config": config,
+        "strategies": list(mix),
+        "feature_names": list(FEATURE_NAMES),
+        "dtype": [list(field) if len(field) == 2 else [field[0], field[1], list(field[2])]
+                  for field in ROW_DTYPE.descr],
+        "shards": [],
+    }
+    path = os.path.join(directory, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+        if previous["config"] != config:
+            raise ValueError(f"{path} was written with different options: {previous['config']}")
+        manifest["shards"] = [entry for entry in previous["shards"]
+                              if os.path.exists(os.path.join(directory, entry["file"]))]
+
+    done = {entry["index"] for entry in manifest["shards"]}
+    tasks = [(directory, index, shard_rows, mix, seed, hand_size, simulations, max_turns)
+             for index in range(shards) if index not in done]
+
+    def record(entry):
+        manifest["shards"].append(entry)
+        manifest["shards"].sort(key=lambda e: e["index"])
+        _write_manifest(directory, manifest)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            record(_build_shard(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(_build_shard, task) for task in tasks]):
+                record(future.result())
+    _write_manifest(directory, manifest)
+    return manifest
+
+
+def load_shards(directory):
+    """Yield each complete shard as a read-only memory-mapped structured array."""
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    for entry in manifest["shards"]:
+        yield np.load(os.path.join(directory, entry["file"]), mmap_mode="r")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate self-play training shards.")
+    parser.add_argument("directory")
+    parser.add_argument("--shards", type=int, default=10)
+    parser.add_argument("--shard-rows", type=int, default=100_000, help="decisions per shard")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("random:1,priority:1"),
+                        help="strategy weights per seat, e.g. random:1,priority:2,monte_carlo:1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--hand-size", type=int, default=7)
+    parser.add_argument("--simulations", type=int, default=50, help="rollouts per card for monte_carlo")
+    parser.add_argument("--max-turns", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    manifest = generate(args.directory, args.shards, args.shard_rows, args.mix, args.seed, args.workers,
+                        args.hand_size, args.simulations, args.max_turns)
+    print(f"{len(manifest['shards'])} shard(s) of {args.shard_rows} rows in {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
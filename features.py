@@ -0,0 +1,58 @@
+"""Fixed-width feature vectors of a Game position, for learned strategies.
+
+state_features describes what the player to move can see:
+
+    hand_<id>           count of card id <id> in their hand (NUM_CARD_IDS columns)
+    top_card            card id on the discard pile
+    color               active colour index, NO_COLOR if a wild's colour is not chosen yet
+    hand_size           cards in their hand
+    opponent_hand_size  fewest cards held by any other player
+    direction           Game.play_direction
+    deck_size           cards left in the draw pile
+
+gamestate_features computes the same vector from a rollout GameState, which
+doesn't track direction (it is always 1 there).
+"""
+import numpy as np
+
+from game_engine import COLOR_INDEX, NO_COLOR, NUM_CARD_IDS, WILD_ID, FACES_PER_COLOR
+
+FEATURE_NAMES = tuple([f"hand_{cid}" for cid in range(NUM_CARD_IDS)]
+                      + ["top_card", "color", "hand_size", "opponent_hand_size", "direction", "deck_size"])
+NUM_FEATURES = len(FEATURE_NAMES)
+FEATURE_DTYPE = np.int16
+
+
+def state_features(game, player_id, out=None):
+    """Fill `out` (or a new int16 array of NUM_FEATURES) with player_id's view of game."""
+    if out is None:
+        out = np.zeros(NUM_FEATURES, dtype=FEATURE_DTYPE)
+    hand = game.players[player_id].hand
+    out[:NUM_CARD_IDS] = np.frombuffer(hand.counts, dtype=np.uint8)
+    out[NUM_CARD_IDS] = game.discard_pile[-1].id
+    out[NUM_CARD_IDS + 1] = COLOR_INDEX.get(game.current_color(), NO_COLOR)
+    out[NUM_CARD_IDS + 2] = len(hand)
+    out[NUM_CARD_IDS + 3] = min(len(player.hand) for pid, player in game.players.items() if pid != player_id)
+    out[NUM_CARD_IDS + 4] = game.play_direction
+    out[NUM_CARD_IDS + 5] = len(game.deck)
+    return out
+
+
+def gamestate_features(state, player_id, out=None):
+    """state_features for a GameState."""
+    if out is None:
+        out = np.zeros(NUM_FEATURES, dtype=FEATURE_DTYPE)
+    else:
+        out[:NUM_CARD_IDS] = 0
+    hand = state.hands[player_id]
+    for cid in hand:
+        out[cid] += 1
+    top = state.discard[-1]
+    out[NUM_CARD_IDS] = top
+    out[NUM_CARD_IDS + 1] = (COLOR_INDEX.get(state.wild_color, NO_COLOR) if top >= WILD_ID
+                             else top // FACES_PER_COLOR)
+    out[NUM_CARD_IDS + 2] = len(hand)
+    out[NUM_CARD_IDS + 3] = min(len(cards) for pid, cards in state.hands.items() if pid != player_id)
+    out[NUM_CARD_IDS + 4] = 1
+    out[NUM_CARD_IDS + 5] = len(state.deck)
+    return out
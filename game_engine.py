@@ -1,32 +1,92 @@
+import math
+import operator
 import random
 import os
-import pandas as pd
-from copy import deepcopy
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from history import GameHistory, ACTION_CODES, NO_CARD
+
+COLORS = ["Red", "Green", "Blue", "Yellow"]
+COLOR_SPECIALS = ["Skip", "Reverse", "Draw Two"]
+WILD_SPECIALS = ["Wild", "Wild Draw Four"]
+
+# Cards are identified by small integer ids: each colour has 13 faces
+# (0-9, Skip, Reverse, Draw Two) followed by Wild and Wild Draw Four.
+FACES_PER_COLOR = 13
+WILD_ID = len(COLORS) * FACES_PER_COLOR
+WILD_DRAW_FOUR_ID = WILD_ID + 1
+NUM_CARD_IDS = WILD_DRAW_FOUR_ID + 1
+NO_COLOR = len(COLORS)
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+
+
+def card_id(number=None, color=None, special=None):
+    if special in WILD_SPECIALS:
+        return WILD_ID + WILD_SPECIALS.index(special)
+    if color in COLOR_INDEX:
+        base = COLOR_INDEX[color] * FACES_PER_COLOR
+        if special is None and number in range(10):
+            return base + number
+        if special in COLOR_SPECIALS:
+            return base + 10 + COLOR_SPECIALS.index(special)
+    raise ValueError(f"Not an UNO card: number={number!r}, color={color!r}, special={special!r}")
+
 
 class Card:
-    def __init__(self, number=None, color=None, special=None):
-        self.number = number
-        self.color = color
-        self.special = special
-        self.path = self.path_finder(number, color, special)
+    """Immutable card face. Card(...) returns the shared instance for that face."""
+    __slots__ = ("id", "number", "color", "special", "path", "_label")
+
+    def __new__(cls, number=None, color=None, special=None):
+        return CARDS[card_id(number, color, special)]
+
+    @classmethod
+    def _create(cls, number=None, color=None, special=None):
+        card = object.__new__(cls)
+        if special in WILD_SPECIALS:
+            color = None
+        if special and color:
+            label = f"{special} ({color})"
+        elif special:
+            label = f"{special}"
+        else:
+            label = f"{number} ({color})"
+        # The one instance per face is shared by every game, so its slots are
+        # only ever written here.
+        for name, value in (("id", card_id(number, color, special)), ("number", number), ("color", color),
+                            ("special", special), ("path", cls.path_finder(number, color, special)),
+                            ("_label", label)):
+            object.__setattr__(card, name, value)
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Card is immutable; can't set {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Card is immutable; can't delete {name!r}")
 
     def __str__(self):
-        if self.special and self.color:
-            return f"{self.special} ({self.color})"
-        elif self.special:
-            return f"{self.special}"
-        return f"{self.number} ({self.color})"
-
-    def is_playable_on(self, other_card):
-        if self.special in ["Wild", "Wild Draw Four"]:
-            return True
-        if self.color == other_card.color:
-            return True
-        if self.number is not None and self.number == other_card.number:
-            return True
-        if self.special is not None and self.special == other_card.special:
-            return True
-        return False
+        return self._label
+
+    def __repr__(self):
+        return f"Card({self._label})"
+
+    def __reduce__(self):
+        return (card_from_id, (self.id,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def is_playable_on(self, other_card, color=None):
+        """Whether this card can go on other_card; color is the chosen colour of a wild top card."""
+        return bool(PLAYABLE[top_key(other_card, color)][self.id])
 
     @staticmethod
     def path_finder(number, color, special):
@@ -42,10 +102,229 @@ class Card:
             return os.path.join("assets", f"{color}_{number}.png")
         return None
 
+
+def _build_cards():
+    cards = []
+    for color in COLORS:
+        cards.extend(Card._create(number=n, color=color) for n in range(10))
+        cards.extend(Card._create(special=special, color=color) for special in COLOR_SPECIALS)
+    cards.extend(Card._create(special=special) for special in WILD_SPECIALS)
+    return tuple(cards)
+
+
+def _build_deck_ids():
+    ids = []
+    for i in list(range(0, 10)) + list(range(1, 10)):
+        for color in COLORS:
+            ids.append(card_id(number=i, color=color))
+    for special in COLOR_SPECIALS:
+        for i in range(2):
+            for color in COLORS:
+                ids.append(card_id(special=special, color=color))
+    for i in range(4):
+        ids.append(WILD_ID)
+        ids.append(WILD_DRAW_FOUR_ID)
+    return tuple(ids)
+
+
+def top_key(top_card, color=None):
+    """Row of PLAYABLE for a top card; color only applies to wild cards."""
+    return top_key_for_id(top_card.id, color)
+
+
+def top_key_for_id(cid, color=None):
+    if cid >= WILD_ID:
+        return cid * (NO_COLOR + 1) + COLOR_INDEX.get(color, NO_COLOR)
+    return cid * (NO_COLOR + 1) + cid // FACES_PER_COLOR
+
+
+def _build_playable():
+    rows = []
+    for top in CARDS:
+        for color_idx in range(NO_COLOR + 1):
+            color = COLORS[color_idx] if color_idx < NO_COLOR else None
+            if top.special not in WILD_SPECIALS:
+                color = top.color
+            row = bytearray(NUM_CARD_IDS)
+            for card in CARDS:
+                row[card.id] = (
+                    card.special in WILD_SPECIALS
+                    or (card.color is not None and card.color == color)
+                    or (card.number is not None and card.number == top.number)
+                    or (card.special is not None and card.special == top.special)
+                )
+            rows.append(bytes(row))
+    return tuple(rows)
+
+
+def card_from_id(cid):
+    return CARDS[cid]
+
+
+CARDS = _build_cards()
+DECK_IDS = _build_deck_ids()
+# Copies of each card id in a full deck, and runs of that many copies to slice.
+DECK_COUNTS = bytes(DECK_IDS.count(cid) for cid in range(NUM_CARD_IDS))
+_ID_RUNS = tuple(bytes([cid]) * count for cid, count in enumerate(DECK_COUNTS))
+# PLAYABLE[top_key(top, color)][card.id] is 1 when card may be played on top.
+PLAYABLE = _build_playable()
+# PLAYABLE_IDS[top_key(top, color)] lists the card ids with a 1 in that row, and
+# PLAYABLE_BITS holds the row bytes as a little-endian int (see Hand.playable_mask).
+PLAYABLE_IDS = tuple(tuple(cid for cid in range(NUM_CARD_IDS) if row[cid]) for row in PLAYABLE)
+PLAYABLE_BITS = tuple(int.from_bytes(row, "little") for row in PLAYABLE)
+_HELD = bytes([0] + [1] * 255)  # bytes.translate table: count -> 1 if any held
+_COPIES = tuple((None,) * count for count in range(256))  # iterate `count` times without a range()
+# Hand's per-colour and per-face indexes for each card id: COLOR_INDEX (NO_COLOR
+# for wilds) and the position of its number or special in FACES.
+FACES = (*range(10), *COLOR_SPECIALS, *WILD_SPECIALS)
+CARD_COLOR_INDEX = bytes(COLOR_INDEX.get(card.color, NO_COLOR) for card in CARDS)
+CARD_FACE_INDEX = bytes(FACES.index(card.special or card.number) for card in CARDS)
+
+# Actions for Game.step and the Game.legal_actions mask: action i < NUM_CARD_IDS
+# plays card id i, DRAW_ACTION draws a card and ends the turn, and
+# COLOR_ACTIONS[i] picks COLORS[i] after playing a wild.
+DRAW_ACTION = NUM_CARD_IDS
+COLOR_ACTIONS = tuple(range(DRAW_ACTION + 1, DRAW_ACTION + 1 + len(COLORS)))
+NUM_ACTIONS = COLOR_ACTIONS[-1] + 1
+_DRAW_MASK = bytes(DRAW_ACTION) + b"\x01" + bytes(len(COLORS))
+_COLOR_MASK = bytes(DRAW_ACTION + 1) + b"\x01" * len(COLORS)
+
+# Monte Carlo rollouts stop after this many turns and fall back to
+# heuristic_evaluation, which weighs the hand size lead, coloured specials
+# held and wilds held.
+DEFAULT_ROLLOUT_DEPTH = 200
+EVALUATION_WEIGHTS = (0.4, 0.1, 0.25)
+# The numpy engine pays a fixed cost per simulated turn, so it only beats the
+# python engine from a few hundred rollouts per call; smaller calls (the
+# default 50 simulations of a few cards, or late halving rounds) use python.
+NUMPY_MIN_BATCH = 256
+
+# A Game draws from one random.Random per stream: deck shuffles, bot
+# decisions and wild colours, and Monte Carlo rollouts. Separate streams keep
+# e.g. the rollout budget from changing which cards are dealt.
+RNG_STREAMS = ("deck", "bot", "rollout")
+
+
+def spawn_rngs(seed):
+    """One random.Random per RNG_STREAMS name, each seeded independently from seed."""
+    return tuple(random.Random(f"{seed}/{name}") for name in RNG_STREAMS)
+
+def _reindexing(method):
+    """Wrap a list method that can change the cards so Hand rebuilds its indexes afterwards."""
+    def wrapper(self, *args):
+        result = method(self, *args)
+        self._reindex()
+        return result
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class Hand(list):
+    """A player's cards, as a list in the order they were drawn, indexed for constant-time queries.
+
+    Alongside the list it keeps counts per card id, colour and face (number
+    or special), updated on append/remove, so membership, colour counts and
+    the cards playable on a top card don't scan the hand. The other list
+    methods that change the cards rebuild the indexes.
+    """
+    __slots__ = ("counts", "color_counts", "face_counts")
+
+    def __init__(self, cards=()):
+        super().__init__(cards)
+        self._reindex()
+
+    def __reduce__(self):
+        return Hand, (list(self),)
+
+    def __contains__(self, card):
+        return isinstance(card, Card) and self.counts[card.id] > 0
+
+    def __repr__(self):
+        return f"Hand({list.__repr__(self)})"
+
+    def _reindex(self):
+        self.counts = bytearray(NUM_CARD_IDS)
+        self.color_counts = [0] * (NO_COLOR + 1)  # wilds count under NO_COLOR
+        self.face_counts = [0] * len(FACES)
+        for card in self:
+            self._index(card.id)
+
+    def _index(self, cid):
+        self.counts[cid] += 1
+        self.color_counts[CARD_COLOR_INDEX[cid]] += 1
+        self.face_counts[CARD_FACE_INDEX[cid]] += 1
+
+    def append(self, card):
+        list.append(self, card)
+        self._index(card.id)
+
+    def remove(self, card):
+        """Remove the first copy of card; ValueError if it isn't held."""
+        cid = card.id
+        counts = self.counts
+        if not counts[cid]:
+            raise ValueError(f"{card} is not in the hand")
+        list.remove(self, card)
+        counts[cid] -= 1
+        self.color_counts[CARD_COLOR_INDEX[cid]] -= 1
+        self.face_counts[CARD_FACE_INDEX[cid]] -= 1
+
+    insert = _reindexing(list.insert)
+    extend = _reindexing(list.extend)
+    pop = _reindexing(list.pop)
+    clear = _reindexing(list.clear)
+    __setitem__ = _reindexing(list.__setitem__)
+    __delitem__ = _reindexing(list.__delitem__)
+    __iadd__ = _reindexing(list.__iadd__)
+    __imul__ = _reindexing(list.__imul__)
+
+    def count(self, card):
+        return self.counts[card.id]
+
+    def count_color(self, color):
+        """Cards held of color; None counts the wilds."""
+        return self.color_counts[COLOR_INDEX.get(color, NO_COLOR)]
+
+    def count_face(self, face):
+        """Cards held with a number (0-9) or special name, e.g. 7 or "Skip"."""
+        return self.face_counts[FACES.index(face)]
+
+    def playable_mask(self, key):
+        """NUM_CARD_IDS bytes, 1 for each card id held and playable on PLAYABLE row `key`."""
+        held = int.from_bytes(self.counts.translate(_HELD), "little")
+        return (held & PLAYABLE_BITS[key]).to_bytes(NUM_CARD_IDS, "little")
+
+    def playable(self, key, distinct=False):
+        """Cards held that are playable on PLAYABLE row `key`, one per copy unless distinct.
+
+        Scans whichever is shorter, the hand or PLAYABLE_IDS[key], so a
+        20-card hand costs no more than the 20 or so ids playable on any card.
+        """
+        ids = PLAYABLE_IDS[key]
+        if len(self) < len(ids):
+            row = PLAYABLE[key]
+            cards = [card for card in self if row[card.id]]
+            return list(dict.fromkeys(cards)) if distinct else cards
+        counts = self.counts
+        if distinct:
+            return [CARDS[cid] for cid in ids if counts[cid]]
+        return [CARDS[cid] for cid in ids for copy in _COPIES[counts[cid]]]
+
+    def ids(self):
+        """Card ids in draw order, as a GameState hand."""
+        return array("B", [card.id for card in self])
+
+
 class Player:
     def __init__(self, player_id):
         self.player_id = player_id
-        self.hand = []
+        self.hand = Hand()
+
+    def __setattr__(self, name, value):
+        # Accept any list of cards as a hand.
+        if name == "hand" and not isinstance(value, Hand):
+            value = Hand(value)
+        object.__setattr__(self, name, value)
 
     def draw_card(self, card):
         self.hand.append(card)
@@ -56,106 +335,799 @@ class Player:
             return card
         return None
 
+# Game.to_bytes() / GameState.to_bytes() layout, little-endian:
+#   header  STATE_MAGIC, seat count, direction, seat to move, wild colour
+#           (COLOR_INDEX, NO_COLOR if none), seats of the player choosing a
+#           wild's colour and of the winner (NO_SEAT if none)
+#   seats   player id, bot difficulty (0 for a human), hand size, per seat
+#   piles   deck size, discard pile size
+#   cards   one byte per card id: the deck, the discard pile (top last),
+#           then every hand in seat order
+STATE_MAGIC = b"UNO\x01"
+NO_SEAT = 255
+_STATE_HEADER = struct.Struct("<4sBbBBBB")
+_STATE_SEAT = struct.Struct("<HBB")
+_STATE_PILES = struct.Struct("<BB")
+
+
+def _pack_state(player_ids, strategies, hands, deck, discard, position, direction=1, wild_color=None,
+                pending=NO_SEAT, winner=NO_SEAT):
+    parts = [_STATE_HEADER.pack(STATE_MAGIC, len(player_ids), direction, position,
+                                COLOR_INDEX.get(wild_color, NO_COLOR), pending, winner)]
+    parts += [_STATE_SEAT.pack(pid, strategies.get(pid) or 0, len(hands[pid])) for pid in player_ids]
+    parts += [_STATE_PILES.pack(len(deck), len(discard)), bytes(deck), bytes(discard)]
+    parts += [bytes(hands[pid]) for pid in player_ids]
+    return b"".join(parts)
+
+
+def _unpack_state(data):
+    """The fields of a _pack_state() encoding as a dict, with card ids as arrays."""
+    if data[:len(STATE_MAGIC)] != STATE_MAGIC:
+        raise ValueError("Not a game state encoding")
+    _, seats, direction, position, color, pending, winner = _STATE_HEADER.unpack_from(data)
+    offset = _STATE_HEADER.size
+    player_ids, strategies, sizes = [], {}, []
+    for _ in range(seats):
+        pid, strategy, size = _STATE_SEAT.unpack_from(data, offset)
+        offset += _STATE_SEAT.size
+        player_ids.append(pid)
+        strategies[pid] = strategy or None
+        sizes.append(size)
+    deck_size, discard_size = _STATE_PILES.unpack_from(data, offset)
+    offset += _STATE_PILES.size
+    piles = []
+    for size in (deck_size, discard_size, *sizes):
+        piles.append(array("B", data[offset:offset + size]))
+        offset += size
+    if offset != len(data):
+        raise ValueError(f"Game state encoding should be {offset} bytes, got {len(data)}")
+    return {
+        "player_ids": tuple(player_ids),
+        "strategies": strategies,
+        "hands": dict(zip(player_ids, piles[2:])),
+        "deck": piles[0],
+        "discard": piles[1],
+        "position": position,
+        "direction": direction,
+        "wild_color": COLORS[color] if color < NO_COLOR else None,
+        "pending": None if pending == NO_SEAT else player_ids[pending],
+        "winner": None if winner == NO_SEAT else player_ids[winner],
+    }
+
+
+class GameState:
+    """Card positions of a Game as arrays of card ids, cheap to clone for rollouts.
+
+    Cards are shared flyweights so only ids are stored; game history is not copied.
+    Reshuffles, wild colours and random rollouts draw from `rng`, which
+    clones share; without one a random.Random is seeded from the global
+    random module.
+    """
+    __slots__ = ("player_ids", "hands", "deck", "discard", "wild_color", "turn_index", "rng")
+
+    def __init__(self, player_ids, hands, deck, discard, wild_color=None, turn_index=0, rng=None):
+        self.player_ids = player_ids
+        self.hands = hands
+        self.deck = deck
+        self.discard = discard
+        self.wild_color = wild_color
+        self.turn_index = turn_index
+        self.rng = random.Random(random.getrandbits(64)) if rng is None else rng
+
+    def clone(self):
+        return GameState(
+            self.player_ids,
+            {pid: hand[:] for pid, hand in self.hands.items()},
+            self.deck[:],
+            self.discard[:],
+            self.wild_color,
+            self.turn_index,
+            self.rng,
+        )
+
+    def to_bytes(self):
+        """Compact encoding of the card positions and turn, without the rng (see Game.to_bytes)."""
+        return _pack_state(self.player_ids, {}, self.hands, self.deck, self.discard, self.turn_index,
+                           wild_color=self.wild_color)
+
+    @classmethod
+    def from_bytes(cls, data, rng=None):
+        fields = _unpack_state(data)
+        return cls(fields["player_ids"], fields["hands"], fields["deck"], fields["discard"], fields["wild_color"],
+                   fields["position"], rng)
+
+    @property
+    def current_player(self):
+        return self.player_ids[self.turn_index]
+
+    def signature(self, player_id, deck_bucket=10):
+        """Key for EvaluationCache: what player_id can see of the position.
+
+        Their hand as a sorted multiset, the top card and active wild colour,
+        the other players' hand sizes in turn order and the deck size rounded
+        down to a multiple of deck_bucket.
+        """
+        top = self.discard[-1]
+        seat = self.player_ids.index(player_id)
+        others = self.player_ids[seat + 1:] + self.player_ids[:seat]
+        return (
+            bytes(sorted(self.hands[player_id])),
+            top,
+            self.wild_color if top >= WILD_ID else None,
+            tuple(len(self.hands[pid]) for pid in others),
+            len(self.deck) // deck_bucket,
+        )
+
+    def advance(self):
+        self.turn_index = (self.turn_index + 1) % len(self.player_ids)
+
+    def playable(self, player_id):
+        row = PLAYABLE[top_key_for_id(self.discard[-1], self.wild_color)]
+        return [cid for cid in self.hands[player_id] if row[cid]]
+
+    def play(self, player_id, cid):
+        self.hands[player_id].remove(cid)
+        self.discard.append(cid)
+        if cid >= WILD_ID:
+            self.wild_color = self.rng.choice(COLORS)
+
+    def draw(self, player_id):
+        if not self.deck and len(self.discard) > 1:
+            top = self.discard.pop()
+            self.deck = self.discard
+            self.rng.shuffle(self.deck)
+            self.discard = array("B", [top])
+        if self.deck:
+            self.hands[player_id].append(self.deck.pop())
+
+    def determinized(self, observer):
+        """A DeterminizedState that redeals every card observer can't see in this state."""
+        unseen = self.deck[:]
+        for pid, cards in self.hands.items():
+            if pid != observer:
+                unseen += cards
+        return DeterminizedState(self.player_ids, observer, self.hands[observer],
+                                 {pid: len(cards) for pid, cards in self.hands.items()}, unseen, self.discard,
+                                 self.wild_color, self.turn_index, self.rng)
+
+
+class _DealtState(GameState):
+    """A GameState whose deck is in no particular order: each draw takes a random card.
+
+    That is one Fisher-Yates step per card drawn instead of shuffling the
+    whole deck up front, as batch_rollouts does.
+    """
+    __slots__ = ()
+
+    def draw(self, player_id):
+        deck = self.deck
+        if not deck and len(self.discard) > 1:
+            deck = self.deck = self.discard[:-1]
+            self.discard = self.discard[-1:]
+        if deck:
+            i = self.rng.randrange(len(deck))
+            deck[i], deck[-1] = deck[-1], deck[i]
+            self.hands[player_id].append(deck.pop())
+
+
+class DeterminizedState(_DealtState):
+    """A GameState as `observer` can know it: their hand, the discard pile and everyone's hand size.
+
+    The other hands and the deck are dealt at random from `unseen`, the card
+    ids observer hasn't seen. Every clone() deals them afresh, so each
+    rollout plays a different plausible world rather than the real one.
+    """
+    __slots__ = ("observer", "unseen")
+
+    def __init__(self, player_ids, observer, hand, hand_sizes, unseen, discard, wild_color=None, turn_index=0,
+                 rng=None):
+        # Placeholder hands of the right sizes until the first deal.
+        hands = {pid: hand if pid == observer else bytes(size) for pid, size in hand_sizes.items()}
+        super().__init__(player_ids, hands, None, discard, wild_color, turn_index, rng)
+        self.observer = observer
+        self.unseen = unseen
+        world = self.clone()
+        self.hands, self.deck = world.hands, world.deck
+
+    def clone(self):
+        pool = self.unseen[:]
+        randrange = self.rng.randrange
+        size = len(pool)
+        hands = {}
+        start = 0
+        for pid, cards in self.hands.items():
+            if pid == self.observer:
+                hands[pid] = cards[:]
+                continue
+            # Partial Fisher-Yates: only the dealt cards are shuffled into place;
+            # the rest of the pool is the deck, which _DealtState draws from at random.
+            end = start + len(cards)
+            for i in range(start, end):
+                j = randrange(i, size)
+                pool[i], pool[j] = pool[j], pool[i]
+            hands[pid] = pool[start:end]
+            start = end
+        return _DealtState(self.player_ids, hands, pool[start:], self.discard[:], self.wild_color, self.turn_index,
+                           self.rng)
+
+
+class CardTracker:
+    """Counts of the card ids that have reached a Game's discard pile, kept up to date incrementally.
+
+    The only other cards a player sees are their own, so the ones they
+    haven't seen (in other hands or the deck) are the full deck less the
+    discards and their hand. Each update() counts just the cards discarded
+    since the last one, and starts over when the pile is replaced, as
+    reshuffle_deck() does.
+    """
+    __slots__ = ("discarded", "_pile", "_counted")
+
+    def __init__(self):
+        self.discarded = bytearray(NUM_CARD_IDS)
+        self._pile = None
+        self._counted = 0
+
+    def update(self, discard_pile):
+        if discard_pile is not self._pile or len(discard_pile) < self._counted:
+            self.discarded = bytearray(NUM_CARD_IDS)
+            self._pile = discard_pile
+            self._counted = 0
+        discarded = self.discarded
+        for card in discard_pile[self._counted:]:
+            discarded[card.id] += 1
+        self._counted = len(discard_pile)
+        return discarded
+
+    def unseen(self, discard_pile, hand):
+        """array of the card ids the holder of `hand` hasn't seen, one entry per copy."""
+        discarded = self.update(discard_pile)
+        counts = hand.counts
+        pool = bytearray()
+        for cid in range(NUM_CARD_IDS):
+            count = DECK_COUNTS[cid] - discarded[cid] - counts[cid]
+            if count > 0:
+                pool += _ID_RUNS[cid][:count]
+        return array("B", pool)
+
+# choose_with_priority prefers any number card, highest first, then the
+# specials in this order. PRIORITY_IDS[key] is PLAYABLE_IDS[key] in that order.
+SPECIAL_PRIORITY = ["Wild Draw Four", "Wild", "Draw Two", "Skip", "Reverse"]
+
+
+def _priority(cid):
+    card = CARDS[cid]
+    if card.number is not None:
+        return 0, -card.number
+    return 1, SPECIAL_PRIORITY.index(card.special)
+
+
+PRIORITY_IDS = tuple(tuple(sorted(ids, key=_priority)) for ids in PLAYABLE_IDS)
+
+
 class Strategy:
     @staticmethod
-    def choose_random_card(hand, top_card):
-        playable_cards = [card for card in hand if card.is_playable_on(top_card)]
+    def choose_random_card(hand, top_card, color=None, rng=random):
+        hand = hand if isinstance(hand, Hand) else Hand(hand)
+        playable_cards = hand.playable(top_key(top_card, color))
         if playable_cards:
-            return random.choice(playable_cards)
+            return rng.choice(playable_cards)
         return None
 
     @staticmethod
-    def choose_with_priority(hand, top_card):
-        playable_cards = [card for card in hand if card.is_playable_on(top_card)]
-        if not playable_cards:
-            return None
+    def choose_with_priority(hand, top_card, color=None):
+        """Play the highest number possible, else the first special in SPECIAL_PRIORITY."""
+        hand = hand if isinstance(hand, Hand) else Hand(hand)
+        counts = hand.counts
+        for cid in PRIORITY_IDS[top_key(top_card, color)]:
+            if counts[cid]:
+                return CARDS[cid]
+        return None
 
-        number_cards = [card for card in playable_cards if card.number is not None]
-        if number_cards:
-            return max(number_cards, key=lambda c: c.number)
+    @staticmethod
+    def choose_with_model(game, player_id, model=None):
+        """Pick the playable card a learned policy.PolicyModel scores highest.
 
-        for special in ["Wild Draw Four", "Wild", "Draw Two", "Skip", "Reverse"]:
-            for card in playable_cards:
-                if card.special == special:
-                    return card
+        All playable cards are scored in one batched call. Without a model
+        the one saved at policy.DEFAULT_MODEL_PATH is used, and if there is
+        none this falls back to choose_with_priority.
+        """
+        if model is None:
+            from policy import load_policy
+            model = load_policy()
+        player = game.players[player_id]
+        if model is None:
+            return Strategy.choose_with_priority(player.hand, game.discard_pile[-1], game.wild_color)
 
-        return playable_cards[0]
+        playable_cards = player.hand.playable(game.top_key(), distinct=True)
+        if len(playable_cards) < 2:
+            return playable_cards[0] if playable_cards else None
+        from features import state_features
+        scores = model.score_cards(state_features(game, player_id), [card.id for card in playable_cards])
+        return playable_cards[int(scores.argmax())]
 
     @staticmethod
-    def monte_carlo_card(game, player_id, simulations=50):
-        player = game.players[player_id]
-        top_card = game.discard_pile[-1]
-        playable_cards = [card for card in player.hand if card.is_playable_on(top_card)]
+    def monte_carlo_card(game, player_id, simulations=50, time_budget=None, workers=None, engine="python",
+                         allocation="uniform", max_depth=DEFAULT_ROLLOUT_DEPTH, evaluate=None, cache=None,
+                         policy=None, determinize=True):
+        """Pick the playable card whose random rollouts score best.
+
+        See monte_carlo_stats for the options.
+        """
+        stats = Strategy.monte_carlo_stats(game, player_id, simulations, time_budget, workers, engine, allocation,
+                                           max_depth, evaluate, cache, policy, determinize)
+        if not stats:
+            return None
+        return max(stats, key=lambda c: stats[c][0] / max(stats[c][1], 1))
+
+    @staticmethod
+    def monte_carlo_stats(game, player_id, simulations=50, time_budget=None, workers=None, engine="python",
+                          allocation="uniform", max_depth=DEFAULT_ROLLOUT_DEPTH, evaluate=None, cache=None,
+                          policy=None, determinize=True):
+        """Run the rollouts behind monte_carlo_card and return {card: (wins, visits)} per playable card.
+
+        With allocation="uniform" every playable card gets `simulations`
+        rollouts. "halving" (successive halving) and "ucb" (UCB1) spend the
+        same total budget but drop or starve losing cards early, so a single
+        playable card gets no rollouts at all. With `time_budget` (seconds)
+        rollouts run round-robin over the cards until the deadline instead,
+        spread over `workers` processes when given. engine="numpy" plays
+        uniform and halving rounds in lockstep with batch_rollouts; rounds
+        of fewer than NUMPY_MIN_BATCH rollouts run on the python engine.
 
+        Rollouts stop after `max_depth` turns and are then scored by
+        `evaluate(state, player_id)` (heuristic_evaluation by default), so
+        wins are fractional. `policy(state, player_id, playable_ids)` picks
+        the card id each rollout player plays instead of a random one (e.g.
+        PolicyModel.rollout_policy). The numpy engine only supports the
+        default evaluation and policy.
+
+        With `determinize` every rollout starts from a world dealt from the
+        cards player_id hasn't seen (see Game.determinized); otherwise
+        rollouts use the real hidden hands and deck.
+
+        With an EvaluationCache, results from earlier searches of a position
+        with the same GameState.signature() are added in: uniform allocation
+        only tops each card up to `simulations` visits, and the new rollouts
+        are merged back into the cache.
+        """
+        playable_cards = game.players[player_id].hand.playable(game.top_key(), distinct=True)
         if not playable_cards:
+            return {}
+
+        state = game.determinized(player_id) if determinize else game.snapshot(player_id)
+        card_ids = [card.id for card in playable_cards]
+        limits = {"max_depth": max_depth, "evaluate": evaluate, "policy": policy}
+        cached = {}
+        if cache is not None:
+            key = state.signature(player_id)
+            cached = cache.get(key) or {}
+
+        if time_budget is None and allocation == "uniform" and cached:
+            visits = [max(0, simulations - cached.get(cid, (0, 0))[1]) for cid in card_ids]
+            wins = [rollout_wins(state, player_id, [cid], count, engine, **limits)[0] if count else 0
+                    for cid, count in zip(card_ids, visits)]
+        elif time_budget is not None:
+            if engine != "python" or allocation != "uniform":
+                raise ValueError("time_budget only supports the python engine with uniform allocation")
+            wins, visits = timed_rollouts(state, player_id, card_ids, time_budget, workers, **limits)
+        elif allocation == "uniform":
+            wins = rollout_wins(state, player_id, card_ids, simulations, engine, **limits)
+            visits = [simulations] * len(card_ids)
+        elif allocation == "halving":
+            wins, visits = successive_halving(state, player_id, card_ids, simulations * len(card_ids), engine,
+                                              **limits)
+        elif allocation == "ucb":
+            if engine != "python":
+                raise ValueError("ucb allocation only supports the python engine")
+            wins, visits = ucb_rollouts(state, player_id, card_ids, simulations * len(card_ids), **limits)
+        else:
+            raise ValueError(f"Unknown allocation {allocation!r}")
+
+        if game.metrics is not None:
+            game.metrics.count("rollouts", sum(visits))
+        if cache is not None:
+            for i, cid in enumerate(card_ids):
+                old_wins, old_visits = cached.get(cid, (0, 0))
+                wins[i] += old_wins
+                visits[i] += old_visits
+            cache.put(key, {cid: (wins[i], visits[i]) for i, cid in enumerate(card_ids)})
+
+        return {card: (wins[i], visits[i]) for i, card in enumerate(playable_cards)}
+
+    @staticmethod
+    def random_rollout(state, player_id, max_depth=DEFAULT_ROLLOUT_DEPTH, evaluate=None, policy=None):
+        """Play random legal cards from state, just after player_id moved, and score it for player_id.
+
+        Returns 1.0 if player_id empties their hand first, 0.0 if someone else
+        does, or evaluate(state, player_id) if nobody has after max_depth turns.
+        With a policy, each player plays policy(state, current_id, playable)
+        instead of a random card drawn from state.rng.
+        """
+        hands = state.hands
+        choice = state.rng.choice
+        if not hands[player_id]:
+            return 1.0
+        for turn in range(max_depth):
+            state.advance()
+            current_id = state.current_player
+            playable = state.playable(current_id)
+            if playable:
+                state.play(current_id, policy(state, current_id, playable) if policy else choice(playable))
+                if not hands[current_id]:
+                    return 1.0 if current_id == player_id else 0.0
+            else:
+                state.draw(current_id)
+        return (evaluate or heuristic_evaluation)(state, player_id)
+
+
+def heuristic_evaluation(state, player_id):
+    """Estimate player_id's chance of winning from a GameState, between 0 and 1.
+
+    A logistic score of how many cards player_id is ahead of the closest
+    opponent, plus a bonus for each coloured special and wild still in hand.
+    """
+    hand = state.hands[player_id]
+    closest = min(len(cards) for pid, cards in state.hands.items() if pid != player_id)
+    specials = sum(1 for cid in hand if cid < WILD_ID and cid % FACES_PER_COLOR >= 10)
+    wilds = sum(1 for cid in hand if cid >= WILD_ID)
+    lead_weight, special_weight, wild_weight = EVALUATION_WEIGHTS
+    score = lead_weight * (closest - len(hand)) + special_weight * specials + wild_weight * wilds
+    return 1.0 / (1.0 + math.exp(-score))
+
+class EvaluationCache:
+    """LRU cache of Monte Carlo results keyed by GameState.signature().
+
+    Each entry maps card id -> (wins, visits). Least recently used entries are
+    evicted once there are more than max_entries or their estimated size
+    exceeds max_bytes. Share one cache between games to reuse results across
+    turns and games.
+    """
+
+    def __init__(self, max_entries=100_000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
             return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, stats):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        size = self._entry_size(key, stats)
+        self._entries[key] = (stats, size)
+        self.bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
+
+    @staticmethod
+    def _entry_size(key, stats):
+        size = sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) + sys.getsizeof(stats)
+        for value in stats.values():
+            size += sys.getsizeof(value) + sum(sys.getsizeof(n) for n in value)
+        return size
+
+_ROLLOUT_POOL = None
+_ROLLOUT_POOL_WORKERS = 0
+
+
+def rollout_pool(workers):
+    """Shared process pool for parallel rollouts, created on first use."""
+    global _ROLLOUT_POOL, _ROLLOUT_POOL_WORKERS
+    if _ROLLOUT_POOL is None or _ROLLOUT_POOL_WORKERS != workers:
+        from concurrent.futures import ProcessPoolExecutor
+
+        shutdown_rollout_pool()
+        _ROLLOUT_POOL = ProcessPoolExecutor(max_workers=workers)
+        _ROLLOUT_POOL_WORKERS = workers
+    return _ROLLOUT_POOL
+
+
+def shutdown_rollout_pool():
+    global _ROLLOUT_POOL, _ROLLOUT_POOL_WORKERS
+    if _ROLLOUT_POOL is not None:
+        _ROLLOUT_POOL.shutdown(cancel_futures=True)
+    _ROLLOUT_POOL = None
+    _ROLLOUT_POOL_WORKERS = 0
+
+
+def play_rollout(state, player_id, cid, max_depth=DEFAULT_ROLLOUT_DEPTH, evaluate=None, policy=None):
+    """Score one rollout of player_id playing card id `cid` from a clone of state."""
+    sim_state = state.clone()
+    sim_state.play(player_id, cid)
+    return Strategy.random_rollout(sim_state, player_id, max_depth, evaluate, policy)
+
+
+def rollout_wins(state, player_id, card_ids, simulations, engine="python", max_depth=DEFAULT_ROLLOUT_DEPTH,
+                 evaluate=None, policy=None):
+    """Play `simulations` rollouts after each card id and return the summed score per card.
+
+    The numpy engine falls back to python below NUMPY_MIN_BATCH rollouts.
+    """
+    if engine == "numpy":
+        if evaluate is not None or policy is not None:
+            raise ValueError("the numpy rollout engine only supports the default evaluation and policy")
+        if len(card_ids) * simulations < NUMPY_MIN_BATCH:
+            engine = "python"
+    if engine == "numpy":
+        from batch_rollouts import batch_rollout_wins
+        return batch_rollout_wins(state, player_id, card_ids, simulations, max_depth,
+                                  rng=state.rng.getrandbits(64)).tolist()
+    if engine != "python":
+        raise ValueError(f"Unknown rollout engine {engine!r}")
+    return [sum(play_rollout(state, player_id, cid, max_depth, evaluate, policy) for i in range(simulations))
+            for cid in card_ids]
+
+
+def successive_halving(state, player_id, card_ids, budget, engine="python", max_depth=DEFAULT_ROLLOUT_DEPTH,
+                       evaluate=None, policy=None):
+    """Split `budget` rollouts over rounds, keeping the better half of the cards after each round.
+
+    Returns (wins, visits) lists aligned with card_ids.
+    """
+    wins = [0] * len(card_ids)
+    visits = [0] * len(card_ids)
+    alive = list(range(len(card_ids)))
+    rounds = math.ceil(math.log2(len(card_ids))) if len(card_ids) > 1 else 0
+    for round_number in range(rounds):
+        per_card = max(1, budget // (rounds * len(alive)))
+        round_wins = rollout_wins(state, player_id, [card_ids[i] for i in alive], per_card, engine,
+                                  max_depth, evaluate, policy)
+        for i, card_wins in zip(alive, round_wins):
+            wins[i] += card_wins
+            visits[i] += per_card
+        alive.sort(key=lambda i: wins[i] / visits[i], reverse=True)
+        alive = alive[:(len(alive) + 1) // 2]
+    return wins, visits
+
+
+def ucb_rollouts(state, player_id, card_ids, budget, exploration=math.sqrt(2), max_depth=DEFAULT_ROLLOUT_DEPTH,
+                 evaluate=None, policy=None):
+    """Spend up to `budget` rollouts choosing cards by UCB1; return (wins, visits) lists.
+
+    Stops early once the leading card's lower confidence bound clears every
+    other card's upper bound.
+    """
+    n = len(card_ids)
+    wins = [0] * n
+    visits = [0] * n
+    if n < 2:
+        return wins, visits
+    for t in range(budget):
+        if t < n:
+            i = t
+        else:
+            log_t = math.log(t)
+            bounds = [wins[k] / visits[k] + exploration * math.sqrt(log_t / visits[k]) for k in range(n)]
+            i = max(range(n), key=bounds.__getitem__)
+            if t % n == 0:
+                best = max(range(n), key=lambda k: wins[k] / visits[k])
+                lower = wins[best] / visits[best] - exploration * math.sqrt(log_t / visits[best])
+                if all(lower > bounds[k] for k in range(n) if k != best):
+                    break
+        wins[i] += play_rollout(state, player_id, card_ids[i], max_depth, evaluate, policy)
+        visits[i] += 1
+    return wins, visits
+
+
+def _rollouts_until(state, player_id, card_ids, deadline, max_depth, evaluate, policy):
+    wins = [0] * len(card_ids)
+    visits = [0] * len(card_ids)
+    while True:
+        for i, cid in enumerate(card_ids):
+            wins[i] += play_rollout(state, player_id, cid, max_depth, evaluate, policy)
+            visits[i] += 1
+        if time.monotonic() >= deadline:
+            return wins, visits
 
-        card_scores = {card: 0 for card in playable_cards}
 
-        for card in playable_cards:
-            for i in range(simulations):
+def _rollout_worker(data, observer, player_id, card_ids, deadline, seed, max_depth, evaluate, policy):
+    # deadline is a time.monotonic() value, which is system-wide, so time
+    # spent queued in the pool counts against the budget. A worker that only
+    # starts after it adds nothing.
+    if time.monotonic() >= deadline:
+        return [0] * len(card_ids), [0] * len(card_ids)
+    # The state travels as GameState.to_bytes(), a fraction of its pickle;
+    # each worker gets its own seed so they don't replay the same rollouts.
+    state = GameState.from_bytes(data, random.Random(seed))
+    if observer is not None:
+        state = state.determinized(observer)
+    return _rollouts_until(state, player_id, card_ids, deadline, max_depth, evaluate, policy)
 
-                sim_game = deepcopy(game)
-                sim_player = sim_game.players[player_id]
 
-                sim_player.play_card(card)
-                sim_game.discard_pile.append(card)
+# Seconds past the deadline timed_rollouts waits for a worker finishing its
+# last rollout before dropping its results.
+LATE_WORKER_GRACE = 0.005
 
-                sim_players_ids = list(sim_game.players.keys())
-                turn_index = sim_players_ids.index(player_id)
-                while len(sim_game.players) > 1:
-                    current_id = sim_players_ids[turn_index % len(sim_players_ids)]
-                    current_player = sim_game.players.get(current_id)
-                    if current_player:
-                        playable = [c for c in current_player.hand if c.is_playable_on(sim_game.discard_pile[-1])]
-                        if playable:
-                            chosen = random.choice(playable)
-                            current_player.play_card(chosen)
-                            sim_game.discard_pile.append(chosen)
-                        else:
-                            if sim_game.deck:
-                                current_player.draw_card(sim_game.deck.pop())
-                    turn_index += 1
 
-                if player_id not in sim_game.players:
-                    card_scores[card] += 1
+def timed_rollouts(state, player_id, card_ids, time_budget, workers=None, max_depth=DEFAULT_ROLLOUT_DEPTH,
+                   evaluate=None, policy=None):
+    """Run rollouts for each card id until time_budget seconds pass; return (wins, visits) lists.
+
+    Every card gets at least one rollout. With workers > 1 the extra
+    processes come from rollout_pool() and this process runs rollouts too,
+    so `evaluate` and `policy` must be picklable. Workers still running
+    LATE_WORKER_GRACE seconds after the deadline are left out.
+    """
+    deadline = time.monotonic() + time_budget
+    futures = []
+    if workers and workers > 1:
+        pool = rollout_pool(workers - 1)
+        data = state.to_bytes()
+        observer = state.observer if isinstance(state, DeterminizedState) else None
+        for i in range(workers - 1):
+            futures.append(pool.submit(_rollout_worker, data, observer, player_id, card_ids, deadline,
+                                       state.rng.getrandbits(64), max_depth, evaluate, policy))
+
+    wins, visits = _rollouts_until(state, player_id, card_ids, deadline, max_depth, evaluate, policy)
+    for future in futures:
+        try:
+            worker_wins, worker_visits = future.result(
+                timeout=max(0.0, deadline - time.monotonic()) + LATE_WORKER_GRACE)
+        except FuturesTimeoutError:
+            future.cancel()
+            continue
+        for i in range(len(card_ids)):
+            wins[i] += worker_wins[i]
+            visits[i] += worker_visits[i]
+    return wins, visits
+
+# Timer names for the strategy each bot difficulty uses.
+DECISION_TIMERS = {1: "decision.random", 2: "decision.priority", 3: "decision.monte_carlo", 4: "decision.learned"}
+
+# The bot's player id at a default table; tables hold MIN_SEATS to MAX_SEATS players.
+BOT_ID = 100
+MIN_SEATS = 2
+MAX_SEATS = 10
+
+
+class SeatingRing:
+    """Turn order around a table: player ids in seat order, the seat to move and the direction.
+
+    Advancing, skipping, reversing and moving the turn to a given player are
+    all constant-time.
+    """
+    __slots__ = ("seats", "position", "direction", "_seat_of")
+
+    def __init__(self, player_ids):
+        self.seats = tuple(player_ids)
+        self._seat_of = {pid: seat for seat, pid in enumerate(self.seats)}
+        self.position = 0
+        self.direction = 1
+
+    def __len__(self):
+        return len(self.seats)
+
+    @property
+    def current(self):
+        return self.seats[self.position]
+
+    def seat_of(self, player_id):
+        try:
+            return self._seat_of[player_id]
+        except KeyError:
+            raise ValueError(f"Player {player_id!r} has no seat at this table") from None
+
+    def move_to(self, player_id):
+        self.position = self.seat_of(player_id)
+
+    def peek(self, steps=1):
+        """The player `steps` seats on in the current direction."""
+        return self.seats[(self.position + steps * self.direction) % len(self.seats)]
+
+    def advance(self, steps=1):
+        self.position = (self.position + steps * self.direction) % len(self.seats)
+        return self.seats[self.position]
+
+    def reverse(self):
+        self.direction = -self.direction
 
-        best_card = max(card_scores, key=lambda c: card_scores[c])
-        return best_card
 
 class Game:
-    def __init__(self, num_players=1, difficulty=1, simulations=50):
-        self.num_players = num_players
-        self.players = {i: Player(i) for i in range(self.num_players)}
-        self.players[100] = Player(100)
+    def __init__(self, num_players=1, difficulty=1, simulations=50, time_budget=None, workers=None,
+                 rollout_engine="python", allocation="uniform", rollout_depth=DEFAULT_ROLLOUT_DEPTH, cache=None,
+                 instrumentation=None, history=None, policy=None, rollout_policy=None, seed=None, seats=None,
+                 determinize=True):
+        """A game of num_players humans (ids 0, 1, ...) against one bot, BOT_ID, playing `difficulty`.
+
+        Pass `seats` instead for any other table: {player id: bot difficulty,
+        or None for a human}, in turn order, with MIN_SEATS to MAX_SEATS
+        entries.
+
+        The Monte Carlo bot only looks at what it could see unless
+        determinize=False (see Game.determinized).
+        """
+        # Without a seed one is drawn from the global random module, so
+        # random.seed() still reproduces games; game.seed replays this one.
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.deck_rng, self.bot_rng, self.rollout_rng = spawn_rngs(self.seed)
+        if seats is None:
+            seats = {**{i: None for i in range(num_players)}, BOT_ID: difficulty}
+        if not MIN_SEATS <= len(seats) <= MAX_SEATS:
+            raise ValueError(f"A table has {MIN_SEATS} to {MAX_SEATS} seats, got {len(seats)}")
+        for pid, strategy in seats.items():
+            if strategy is not None and strategy not in DECISION_TIMERS:
+                raise ValueError(f"Seat {pid} has unknown bot difficulty {strategy!r}, "
+                                 f"expected None or one of {sorted(DECISION_TIMERS)}")
+        if time_budget is not None and (rollout_engine != "python" or allocation != "uniform"):
+            raise ValueError("time_budget only supports the python rollout engine with uniform allocation")
+        self.num_players = sum(1 for strategy in seats.values() if strategy is None)
+        self.players = {pid: Player(pid) for pid in seats}
+        self.strategies = {pid: strategy for pid, strategy in seats.items() if strategy is not None}
+        self.ring = SeatingRing(self.players)
         self.deck = self.create_deck()
         self.discard_pile = []
+        self.tracker = CardTracker()
+        self.wild_color = None
         self.difficulty = difficulty
-        self.play_direction = 1
         self.winner = None
+        self.pending_color = None
         self.simulations = simulations
-        self.game_history = []
+        self.time_budget = time_budget
+        self.workers = workers
+        self.rollout_engine = rollout_engine
+        self.allocation = allocation
+        self.rollout_depth = rollout_depth
+        self.cache = cache
+        self.policy = policy
+        self.rollout_policy = rollout_policy
+        self.determinize = determinize
+        self.metrics = instrumentation
+        self.game_history = GameHistory() if history is None else history
 
-    def create_deck(self):
-        deck = []
+    @property
+    def current_player(self):
+        return self.ring.seats[self.ring.position]
 
-        for i in list(range(0, 10)) + list(range(1, 10)):
-            for color in ["Red", "Green", "Blue", "Yellow"]:
-                deck.append(Card(number=i, color=color))
+    @current_player.setter
+    def current_player(self, player_id):
+        self.ring.move_to(player_id)
 
-        for special in ["Skip", "Reverse", "Draw Two"]:
-            for i in range(2):
-                for color in ["Red", "Green", "Blue", "Yellow"]:
-                    deck.append(Card(special=special, color=color))
+    @property
+    def play_direction(self):
+        return self.ring.direction
 
-        for i in range(4):
-            deck.append(Card(special="Wild"))
-            deck.append(Card(special="Wild Draw Four"))
+    @play_direction.setter
+    def play_direction(self, direction):
+        self.ring.direction = direction
 
-        random.shuffle(deck)
+    def create_deck(self):
+        deck = [CARDS[cid] for cid in DECK_IDS]
+        self.deck_rng.shuffle(deck)
         return deck
 
     def game_setup(self, hand_size=7):
+        if self.metrics is not None:
+            self.metrics.start_profile()
         for i in range(hand_size):
             for player in self.players.values():
                 player.draw_card(self.deck.pop())
@@ -163,94 +1135,288 @@ class Game:
         first_card = self.deck.pop()
         while first_card.special == "Wild Draw Four":
             self.deck.insert(0, first_card)
-            random.shuffle(self.deck)
+            self.deck_rng.shuffle(self.deck)
             first_card = self.deck.pop()
         self.discard_pile.append(first_card)
 
+    def abandon(self):
+        """End a game that won't be played to a winner, e.g. one cut off at a turn limit.
+
+        Stops the instrumentation profile started by game_setup, which
+        otherwise only stops when someone wins.
+        """
+        if self.metrics is not None:
+            self.metrics.stop_profile()
+
     def reshuffle_deck(self):
         if not self.deck:
+            if self.metrics is not None:
+                started = time.perf_counter()
             top_card = self.discard_pile.pop()
             self.deck = self.discard_pile
-            random.shuffle(self.deck)
+            self.deck_rng.shuffle(self.deck)
             self.discard_pile = [top_card]
+            if self.metrics is not None:
+                self.metrics.count("reshuffles")
+                self.metrics.record("reshuffle_deck", time.perf_counter() - started)
+
+    def snapshot(self, player_id=None):
+        """Return a GameState of the card positions, with the turn at player_id (default: current player)."""
+        if player_id is None:
+            player_id = self.current_player
+        return GameState(
+            self.ring.seats,
+            {pid: player.hand.ids() for pid, player in self.players.items()},
+            array("B", [card.id for card in self.deck]),
+            array("B", [card.id for card in self.discard_pile]),
+            self.wild_color,
+            self.ring.seat_of(player_id),
+            self.rollout_rng,
+        )
+
+    def determinized(self, player_id=None):
+        """A DeterminizedState of the position as player_id (default: current player) can know it.
+
+        Their hand, the discard pile, the turn and hand sizes are real. The
+        other hands and the deck are dealt from the cards self.tracker says
+        they haven't seen, without copying (or looking at) the real ones.
+        """
+        if player_id is None:
+            player_id = self.current_player
+        hand = self.players[player_id].hand
+        unseen = self.tracker.unseen(self.discard_pile, hand)
+        hand_sizes = {pid: len(player.hand) for pid, player in self.players.items()}
+        missing = sum(hand_sizes.values()) - len(hand) - len(unseen)
+        if missing > 0:
+            # Cards were added to hands from outside the deck; make up the difference.
+            unseen.extend(self.rollout_rng.choices(DECK_IDS, k=missing))
+        return DeterminizedState(self.ring.seats, player_id, hand.ids(), hand_sizes, unseen,
+                                 array("B", [card.id for card in self.discard_pile]), self.wild_color,
+                                 self.ring.seat_of(player_id), self.rollout_rng)
+
+    def to_bytes(self):
+        """Encode the table, every card's position, the turn, direction and wild colour in a few hundred bytes.
+
+        Game options, random streams and history are not included: pass
+        them to from_bytes() again. Far smaller and faster than pickling
+        the Game, for checkpoints and for shipping positions to workers.
+        """
+        seats = self.ring.seats
+        return _pack_state(
+            seats,
+            self.strategies,
+            {pid: player.hand.ids() for pid, player in self.players.items()},
+            bytes([card.id for card in self.deck]),
+            bytes([card.id for card in self.discard_pile]),
+            self.ring.position,
+            self.ring.direction,
+            self.wild_color,
+            NO_SEAT if self.pending_color is None else self.ring.seat_of(self.pending_color),
+            NO_SEAT if self.winner is None else self.ring.seat_of(self.winner),
+        )
+
+    @classmethod
+    def from_bytes(cls, data, **options):
+        """Rebuild a Game from to_bytes(); options are any other Game arguments (seed, simulations, ...)."""
+        fields = _unpack_state(data)
+        game = cls(seats=fields["strategies"], **options)
+        game.deck = [CARDS[cid] for cid in fields["deck"]]
+        game.discard_pile = [CARDS[cid] for cid in fields["discard"]]
+        for pid, hand in fields["hands"].items():
+            game.players[pid].hand = [CARDS[cid] for cid in hand]
+        game.ring.position = fields["position"]
+        game.ring.direction = fields["direction"]
+        game.wild_color = fields["wild_color"]
+        game.pending_color = fields["pending"]
+        game.winner = fields["winner"]
+        return game
+
+    def top_key(self):
+        """Row of PLAYABLE for the current top card and chosen wild colour."""
+        return top_key(self.discard_pile[-1], self.wild_color)
+
+    def is_playable(self, card):
+        return bool(PLAYABLE[self.top_key()][card.id])
+
+    def current_color(self):
+        top_card = self.discard_pile[-1]
+        if top_card.special in WILD_SPECIALS:
+            return self.wild_color
+        return top_card.color
 
     def next_player(self, skip=False):
         """Move turn to the next player, respecting direction and skip."""
-        ids = list(self.players.keys())
-        idx = ids.index(self.current_player)
-        step = 2 if skip else 1
-        new_idx = (idx + step * self.play_direction) % len(ids)
-        self.current_player = ids[new_idx]
+        self.ring.advance(2 if skip else 1)
 
     def apply_special(self, card):
-        """Apply effects of special cards after playing them."""
+        """Apply the effects of the card the current player just played and pass the turn.
+
+        Skip, Draw Two and Wild Draw Four make the next player miss their
+        turn (after drawing, for the draw cards); Reverse flips the direction
+        and acts as a Skip with two players. Returns {"force_draw": cards
+        drawn, "skipped": player id skipped or None}.
+        """
+        if self.metrics is not None:
+            started = time.perf_counter()
         effect = self.special_cards(card)
+        force_draw = effect["Force Draw"]
 
         if effect["Reverse"]:
-            self.play_direction *= -1
-        elif effect["Skip"]:
-            self.next_player(skip=True)
-        elif effect["Force Draw"]:
+            self.ring.reverse()
+        skip = effect["Skip"] or force_draw > 0 or (effect["Reverse"] and len(self.ring) == 2)
+        self.next_player()
+        skipped = self.current_player if skip else None
+        if force_draw:
+            self.force_draw_cards(self.current_player, force_draw)
+        if skip:
             self.next_player()
-            self.force_draw_cards(self.current_player, effect["Force Draw"])
-        if effect["Wild Card"]:
-            self.wild_card_color_choice(self.current_player)
+        if self.metrics is not None:
+            self.metrics.record("apply_special", time.perf_counter() - started)
+        return {"force_draw": force_draw, "skipped": skipped}
+
+    def legal_actions(self):
+        """bytearray of NUM_ACTIONS flags, 1 for each action step() accepts now.
+
+        Drawing is always allowed; after a wild only the COLOR_ACTIONS are.
+        """
+        if self.winner is not None:
+            return bytearray(NUM_ACTIONS)
+        if self.pending_color is not None:
+            return bytearray(_COLOR_MASK)
+        mask = bytearray(_DRAW_MASK)
+        mask[:NUM_CARD_IDS] = self.players[self.current_player].hand.playable_mask(self.top_key())
+        return mask
 
-    def player_turn(self, player_id, card):
+    def step(self, action):
+        """Apply one action (see DRAW_ACTION) for the current player and return what happened.
+
+        Playing a wild leaves the turn with the same player until they choose
+        a colour; its effects apply after that. Raises ValueError for an
+        action that legal_actions() doesn't allow. The returned dict has the
+        acting "player_id", the "action" ("play", "draw" or "color"), the
+        "card" played, drawn or coloured (None if the deck was empty), the
+        chosen "color", and the "force_draw"/"skipped" effects on the next
+        player.
+        """
+        if self.winner is not None:
+            raise ValueError("The game is over")
+        try:
+            # Accept any integer type, e.g. the NumPy ints an RL agent produces.
+            action = operator.index(action)
+        except TypeError:
+            raise ValueError(f"Unknown action {action!r}") from None
+        player_id = self.current_player
         player = self.players[player_id]
+        result = {"player_id": player_id, "action": None, "card": None, "color": None, "force_draw": 0,
+                  "skipped": None}
 
-        if card and card in player.hand and card.is_playable_on(self.discard_pile[-1]):
-            played_card = player.play_card(card)
-            self.discard_pile.append(played_card)
-            self.log_move(player_id, "play", played_card)
-            self.apply_special(played_card)
-        else:
+        if self.pending_color is not None:
+            if action not in COLOR_ACTIONS:
+                raise ValueError(f"Player {player_id} must choose a colour, got action {action!r}")
+            self.pending_color = None
+            self.wild_color = COLORS[action - COLOR_ACTIONS[0]]
+            result.update(action="color", card=self.discard_pile[-1], color=self.wild_color)
+            result.update(self.apply_special(self.discard_pile[-1]))
+        elif action == DRAW_ACTION:
+            hand_size = len(player.hand)
             self.force_draw_cards(player_id, 1)
             self.log_move(player_id, "draw", None)
+            result.update(action="draw", card=player.hand[-1] if len(player.hand) > hand_size else None)
+            self.next_player()
+        elif 0 <= action < NUM_CARD_IDS:
+            card = CARDS[action]
+            if not player.hand.counts[action] or not PLAYABLE[self.top_key()][action]:
+                raise ValueError(f"Player {player_id} can't play {card} now")
+            player.play_card(card)
+            self.discard_pile.append(card)
+            self.wild_color = None
+            self.log_move(player_id, "play", card)
+            result.update(action="play", card=card)
+            if not player.hand:
+                self.winner = player_id
+                if self.metrics is not None:
+                    self.metrics.stop_profile()
+            elif card.special in WILD_SPECIALS:
+                self.pending_color = player_id
+            else:
+                result.update(self.apply_special(card))
+        else:
+            raise ValueError(f"Unknown action {action!r}")
+        return result
 
-        if not player.hand:
-            self.winner = player_id
+    def player_turn(self, player_id, card, color=None):
+        """Play card (then colour a wild with color, random if None), or draw if card is None or unplayable.
 
-        self.next_player()
+        Returns the result of the last step().
+        """
+        if player_id != self.current_player:
+            raise ValueError(f"It is player {self.current_player}'s turn, not {player_id}'s")
+        if card and card in self.players[player_id].hand and self.is_playable(card):
+            result = self.step(card.id)
+            if self.pending_color is not None:
+                color_index = COLOR_INDEX[color] if color in COLOR_INDEX else self.bot_rng.randrange(len(COLORS))
+                result = self.step(COLOR_ACTIONS[color_index])
+            return result
+        return self.step(DRAW_ACTION)
+
+    def bot_turn(self, player_id=BOT_ID, difficulty=None):
+        """Play player_id's turn with the bot strategy for difficulty; returns the last step() result."""
+        metrics = self.metrics
+        if metrics is not None:
+            started = time.perf_counter()
+        result = self.player_turn(player_id, self.choose_bot_card(player_id, difficulty))
+        if metrics is not None:
+            metrics.record("bot_turn", time.perf_counter() - started)
+        return result
 
-    def bot_turn(self, player_id=100):
+    def choose_bot_card(self, player_id=BOT_ID, difficulty=None):
+        """The card the bot strategy for `difficulty` would play, or None to draw. Doesn't change the game.
+
+        difficulty defaults to the seat's strategy, or Game.difficulty for a human seat.
+        """
+        metrics = self.metrics
+        if metrics is not None:
+            started = time.perf_counter()
         player = self.players[player_id]
         top_card = self.discard_pile[-1]
+        if difficulty is None:
+            difficulty = self.strategies.get(player_id, self.difficulty)
 
-        if self.difficulty == 1:
-            chosen = Strategy.choose_random_card(player.hand, top_card)
-        elif self.difficulty == 2:
-            chosen = Strategy.choose_with_priority(player.hand, top_card)
-        elif self.difficulty == 3:
-            chosen = Strategy.monte_carlo_card(self, player_id, simulations=self.simulations)
-
-        if chosen:
-            player.play_card(chosen)
-            self.discard_pile.append(chosen)
-            self.log_move(player_id, "play", chosen)
-            self.apply_special(chosen)
+        if difficulty == 1:
+            chosen = Strategy.choose_random_card(player.hand, top_card, self.wild_color, self.bot_rng)
+        elif difficulty == 2:
+            chosen = Strategy.choose_with_priority(player.hand, top_card, self.wild_color)
+        elif difficulty == 3:
+            chosen = Strategy.monte_carlo_card(self, player_id, simulations=self.simulations,
+                                               time_budget=self.time_budget, workers=self.workers,
+                                               engine=self.rollout_engine, allocation=self.allocation,
+                                               max_depth=self.rollout_depth, cache=self.cache,
+                                               policy=self.rollout_policy, determinize=self.determinize)
+        elif difficulty == 4:
+            chosen = Strategy.choose_with_model(self, player_id, self.policy)
         else:
-            self.force_draw_cards(player_id, 1)
-            self.log_move(player_id, "draw", None)
-
-        if not player.hand:
-            self.winner = player_id
-
-        self.next_player()
+            raise ValueError(f"Unknown bot difficulty {difficulty!r}, expected one of {sorted(DECISION_TIMERS)}")
+        if metrics is not None:
+            metrics.record(DECISION_TIMERS[difficulty], time.perf_counter() - started)
+        return chosen
 
     def wild_card_color_choice(self, player_id, choice=None):
-        if player_id == 100:
-            color_choice = random.choice(["Red", "Green", "Blue", "Yellow"])
+        if player_id in self.strategies or choice is None:
+            color_choice = self.bot_rng.choice(COLORS)
         else:
             color_choice = choice
-        self.discard_pile[-1].color = color_choice
+        self.wild_color = color_choice
 
     def force_draw_cards(self, player_id, num_cards):
         player = self.players[player_id]
         for i in range(num_cards):
             if not self.deck:
                 self.reshuffle_deck()
+            if not self.deck:
+                break
             player.draw_card(self.deck.pop())
+            if self.metrics is not None:
+                self.metrics.count("cards_drawn")
 
     def special_cards(self, card):
         card_effect = {
@@ -275,13 +1441,18 @@ class Game:
         return card_effect
 
     def log_move(self, player_id, action, card):
-        self.game_history.append({
-            "player_id": player_id,
-            "action": action,
-            "card": str(card) if card else None,
-            "hand_size": len(self.players[player_id].hand),
-            "top_card": str(self.discard_pile[-1])
-        })
+        if self.metrics is not None:
+            # Every turn logs exactly one move.
+            self.metrics.count("turns")
+            self.metrics.count(f"played.{card.special or 'Number'}" if card else "draws")
+        top_card = self.discard_pile[-1]
+        if top_card.special in WILD_SPECIALS and self.wild_color:
+            top_color = COLOR_INDEX[self.wild_color]
+        else:
+            top_color = NO_COLOR
+        self.game_history.append(player_id, ACTION_CODES[action], card.id if card else NO_CARD, top_card.id,
+                                 top_color, len(self.players[player_id].hand))
 
     def return_game_history(self):
-        return pd.DataFrame(self.game_history)
+        """DataFrame of the moves in game_history that have not been streamed to disk."""
+        return self.game_history.to_frame()
@@ -1,6 +1,8 @@
 import pygame
+import queue
 import sys
 import os
+import threading
 from game_engine import *
 
 # Constants
@@ -10,10 +12,19 @@ HAND_Y = SCREEN_HEIGHT - CARD_HEIGHT - 30
 BOT_HAND_Y = 30
 DISCARD_X, DISCARD_Y = SCREEN_WIDTH // 2 - CARD_WIDTH // 2, SCREEN_HEIGHT // 2 - CARD_HEIGHT // 2
 BG_COLOR = (34, 139, 34)
+DISCARD_RECT = (DISCARD_X, DISCARD_Y, CARD_WIDTH, CARD_HEIGHT)
+DECK_RECT = (DISCARD_X - 120, DISCARD_Y, CARD_WIDTH, CARD_HEIGHT)
+MESSAGE_POS = (20, SCREEN_HEIGHT // 2 - 30)
+STATUS_POS = (20, HAND_Y - 40)
+FPS = 30
+IDLE_FPS = 10  # frame rate while nothing on screen changes
+BOT_DELAY_MS = 800  # shortest time the bot appears to think
+BOT_TIME_BUDGET = 1.0  # seconds per Monte Carlo decision at difficulty 3
 TABLE_IMAGE_PATH = os.path.join("assets", "Table.png")
+DECK_IMAGE_PATH = os.path.join("assets", "Deck.png")
 def draw_background():
-    if os.path.exists(TABLE_IMAGE_PATH):
-        table_img = pygame.transform.scale(pygame.image.load(TABLE_IMAGE_PATH), (SCREEN_WIDTH, SCREEN_HEIGHT))
+    table_img = load_table_image()
+    if table_img:
         screen.blit(table_img, (0, 0))
     else:
         screen.fill(BG_COLOR)
@@ -24,29 +35,61 @@ screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("UNO - GUI Edition")
 font = pygame.font.SysFont(None, 32)
 
+# Loaded and scaled images, keyed by card id, "deck" or "table". Blits reuse
+# these surfaces instead of reading and scaling the PNGs every frame.
+sprites = {}
+
+def _load_scaled(path, size):
+    image = pygame.image.load(path)
+    image = image.convert_alpha() if image.get_alpha() is not None else image.convert()
+    return pygame.transform.scale(image, size)
+
+def load_sprites():
+    """Load every card face, the deck back and the table into the sprite cache."""
+    for card in CARDS:
+        load_card_image(card)
+    load_deck_image()
+    load_table_image()
+
+def load_table_image():
+    if "table" not in sprites:
+        sprites["table"] = (_load_scaled(TABLE_IMAGE_PATH, (SCREEN_WIDTH, SCREEN_HEIGHT))
+                            if os.path.exists(TABLE_IMAGE_PATH) else None)
+    return sprites["table"]
+
 # Load card images
 def load_card_image(card):
+    sprite = sprites.get(card.id)
+    if sprite is None:
+        sprite = sprites[card.id] = _render_card_image(card)
+    return sprite
+
+def _render_card_image(card):
     if card.path and os.path.exists(card.path):
-        return pygame.transform.scale(pygame.image.load(card.path), (CARD_WIDTH, CARD_HEIGHT))
+        return _load_scaled(card.path, (CARD_WIDTH, CARD_HEIGHT))
     # fallback: draw a colored rect
     surf = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
     surf.fill((200, 200, 200))
     pygame.draw.rect(surf, (0, 0, 0), surf.get_rect(), 2)
     text = font.render(str(card), True, (0, 0, 0))
     surf.blit(text, (5, CARD_HEIGHT // 2 - 10))
-    return surf
+    return surf.convert()
 
 # Load deck image
 def load_deck_image():
-    deck_path = os.path.join("assets", "Deck.png")
-    if os.path.exists(deck_path):
-        return pygame.transform.scale(pygame.image.load(deck_path), (CARD_WIDTH, CARD_HEIGHT))
+    if "deck" not in sprites:
+        sprites["deck"] = _render_deck_image()
+    return sprites["deck"]
+
+def _render_deck_image():
+    if os.path.exists(DECK_IMAGE_PATH):
+        return _load_scaled(DECK_IMAGE_PATH, (CARD_WIDTH, CARD_HEIGHT))
     surf = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
     surf.fill((80, 80, 80))
     pygame.draw.rect(surf, (0, 0, 0), surf.get_rect(), 2)
     text = font.render("Deck", True, (255, 255, 255))
     surf.blit(text, (10, CARD_HEIGHT // 2 - 10))
-    return surf
+    return surf.convert()
 
 def draw_hand(hand, y, selected_idx=None, hide_cards=False):
     x = 40
@@ -71,6 +114,105 @@ def draw_text(text, x, y, color=FONT_COLOR):
     surf = font.render(text, True, color)
     screen.blit(surf, (x, y))
 
+def draw_deck():
+    screen.blit(load_deck_image(), DECK_RECT[:2])
+
+def hand_rect(hand, y):
+    return pygame.Rect(40, y, len(hand) * (CARD_WIDTH + 10), CARD_HEIGHT)
+
+def text_rect(text, x, y):
+    return pygame.Rect((x, y), font.size(text))
+
+class Renderer:
+    """Redraws only the screen regions whose content changed since the last frame.
+
+    Each frame is described as layers (name, rect, key, draw) in back-to-front
+    order. A layer is dirty when its rect or key differs from last frame's,
+    or it was added or removed. Dirty rects get the background and every
+    layer overlapping them redrawn, clipped to the rect, and only those rects
+    are pushed to the display.
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.layers = {}
+        self.full = True
+
+    def invalidate(self):
+        """Redraw everything next frame, e.g. after something drew over the screen directly."""
+        self.full = True
+
+    def render(self, layers):
+        """Draw one frame and return the list of rects that were updated."""
+        bounds = self.surface.get_rect()
+        current = {name: (pygame.Rect(rect), key) for name, rect, key, draw in layers}
+        if self.full:
+            dirty = [bounds]
+        else:
+            dirty = []
+            for name in current.keys() | self.layers.keys():
+                old, new = self.layers.get(name), current.get(name)
+                if old != new:
+                    dirty.extend(entry[0] for entry in (old, new) if entry is not None)
+            dirty = [rect.clip(bounds) for rect in dirty]
+            dirty = [rect for rect in dirty if rect.width and rect.height]
+        self.layers = current
+        self.full = False
+        if not dirty:
+            return dirty
+
+        for rect in dirty:
+            self.surface.set_clip(rect)
+            draw_background()
+            for name, layer_rect, key, draw in layers:
+                if rect.colliderect(current[name][0]):
+                    draw()
+        self.surface.set_clip(None)
+        pygame.display.update(dirty)
+        return dirty
+
+class BotWorker:
+    """Runs Game.choose_bot_card on a background thread so the window stays responsive.
+
+    start() begins a decision, poll() returns (True, card) once it is ready,
+    and cancel() discards whatever is in flight. The thread is a daemon, so
+    an unfinished decision never keeps the program alive after the window
+    closes.
+    """
+
+    def __init__(self):
+        self.results = queue.Queue()
+        self.generation = 0
+        self.busy = False
+
+    def start(self, game, player_id=100):
+        self.generation += 1
+        self.busy = True
+        threading.Thread(target=self._run, args=(self.generation, game, player_id), daemon=True).start()
+
+    def _run(self, generation, game, player_id):
+        try:
+            result = game.choose_bot_card(player_id)
+        except Exception as exc:
+            result = exc
+        self.results.put((generation, result))
+
+    def poll(self):
+        while True:
+            try:
+                generation, result = self.results.get_nowait()
+            except queue.Empty:
+                return False, None
+            if generation == self.generation:
+                self.busy = False
+                if isinstance(result, Exception):
+                    raise result
+                return True, result
+
+    def cancel(self):
+        self.generation += 1
+        self.busy = False
+
 def choose_color_popup():
     colors = ["Red", "Green", "Blue", "Yellow"]
     color_rects = []
@@ -82,199 +224,133 @@ def choose_color_popup():
         color_rects.append((rect, color))
     pygame.display.flip()
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                mx, my = pygame.mouse.get_pos()
-                for rect, color in color_rects:
-                    if rect.collidepoint(mx, my):
-                        return color
-
-def main():
-    game = Game(num_players=1, difficulty=2)
+        event = pygame.event.wait()
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            mx, my = pygame.mouse.get_pos()
+            for rect, color in color_rects:
+                if rect.collidepoint(mx, my):
+                    return color
+
+def describe_effects(result):
+    """Status text for what a step() result did to the next player."""
+    by_bot = result["player_id"] == 100
+    if result["force_draw"]:
+        return f"{'You draw' if by_bot else 'Bot draws'} {result['force_draw']} cards!"
+    if result["skipped"] is not None:
+        return "Your turn is skipped!" if by_bot else "Bot's turn skipped!"
+    return ""
+
+def main(difficulty=2):
+    load_sprites()
+    game = Game(num_players=1, difficulty=difficulty, time_budget=BOT_TIME_BUDGET)
     game.game_setup()
     player = game.players[0]
     bot = game.players[100]
-    turn = 0  # 0: player, 1: bot
     selected_idx = None
     message = ""
     running = True
     clock = pygame.time.Clock()
+    renderer = Renderer(screen)
+    bot_worker = BotWorker()
+    bot_started = 0
+
+    while running and game.winner is None:
+        top_card = game.discard_pile[-1]
+        status = ""
+        if bot_worker.busy:
+            status = "Bot is thinking" + "." * ((pygame.time.get_ticks() - bot_started) // 300 % 4)
+        elif game.current_player == 0 and not any(game.legal_actions()[:DRAW_ACTION]):
+            status = "No playable cards. Click the deck to draw."
+        layers = [
+            ("player_hand", hand_rect(player.hand, HAND_Y), ([card.id for card in player.hand], selected_idx),
+             lambda: draw_hand(player.hand, HAND_Y, selected_idx)),
+            ("bot_hand", hand_rect(bot.hand, BOT_HAND_Y), len(bot.hand),
+             lambda: draw_hand(bot.hand, BOT_HAND_Y, hide_cards=True)),
+            ("discard", DISCARD_RECT, top_card.id, lambda: draw_discard(top_card)),
+            ("message", text_rect(message, *MESSAGE_POS), message, lambda: draw_text(message, *MESSAGE_POS)),
+            ("status", text_rect(status, *STATUS_POS), status, lambda: draw_text(status, *STATUS_POS)),
+            ("deck", DECK_RECT, None, draw_deck),
+        ]
+        dirty = renderer.render(layers)
+        clock.tick(FPS if dirty or bot_worker.busy else IDLE_FPS)
 
-    player_drawn_this_turn = False
-    player_must_end_turn = False
-    while running:
-        draw_background()
-        # Draw hands
-        draw_hand(player.hand, HAND_Y, selected_idx)
-        draw_hand(bot.hand, BOT_HAND_Y, hide_cards=True)
-        # Draw discard pile
-        draw_discard(game.discard_pile[-1])
-        # Draw message
-        draw_text(message, 20, SCREEN_HEIGHT // 2 - 30)
-        # Draw deck
-        deck_img = load_deck_image()
-        screen.blit(deck_img, (DISCARD_X - 120, DISCARD_Y))
-        # Draw end turn button if needed
-        if player_must_end_turn:
-            end_turn_rect = pygame.Rect(SCREEN_WIDTH - 180, SCREEN_HEIGHT - 80, 160, 50)
-            pygame.draw.rect(screen, (200, 50, 50), end_turn_rect)
-            draw_text("End Turn", end_turn_rect.x + 30, end_turn_rect.y + 10, (255,255,255))
-        pygame.display.flip()
-        clock.tick(30)
-
-        if turn == 0:
+        if game.current_player == 0:
             # Player's turn
-            playable = [i for i, card in enumerate(player.hand) if card.is_playable_on(game.discard_pile[-1])]
+            mask = game.legal_actions()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     mx, my = pygame.mouse.get_pos()
-                    # End turn button
-                    if player_must_end_turn:
-                        end_turn_rect = pygame.Rect(SCREEN_WIDTH - 180, SCREEN_HEIGHT - 80, 160, 50)
-                        if end_turn_rect.collidepoint(mx, my):
-                            player_drawn_this_turn = False
-                            player_must_end_turn = False
-                            turn = 1
-                            message = ""
-                            continue
-                    # Select card
+                    # Select or play a card
                     for idx, card in enumerate(player.hand):
                         x = 40 + idx * (CARD_WIDTH + 10)
                         if x <= mx <= x + CARD_WIDTH and HAND_Y <= my <= HAND_Y + CARD_HEIGHT:
                             selected_idx = idx
-                            if idx in playable and not player_must_end_turn:
-                                played_card = player.hand[idx]
-                                player.play_card(played_card)
-                                game.discard_pile.append(played_card)
+                            if mask[card.id]:
                                 selected_idx = None
-                                # Wild color choice
-                                if played_card.special in ["Wild", "Wild Draw Four"]:
+                                result = game.step(card.id)
+                                if game.pending_color is not None:
                                     color = choose_color_popup()
-                                    game.wild_card_color_choice(0, color)
-                                # Special cards
-                                effect = game.special_cards(played_card)
-                                if effect["Force Draw"]:
-                                    message = f"Bot draws {effect['Force Draw']} cards!"
-                                    game.force_draw_cards(100, effect["Force Draw"])
-                                if effect["Skip"]:
-                                    message = "Bot's turn skipped!"
-                                    turn = 0
-                                    break
-                                if not player.hand:
-                                    message = "You win!"
-                                    running = False
-                                    break
-                                turn = 1
-                                break
-                            elif player_must_end_turn and idx in playable and player_drawn_this_turn:
-                                # Allow playing the drawn card if playable
-                                played_card = player.hand[idx]
-                                if played_card.is_playable_on(game.discard_pile[-1]):
-                                    player.play_card(played_card)
-                                    game.discard_pile.append(played_card)
-                                    selected_idx = None
-                                    player_drawn_this_turn = False
-                                    player_must_end_turn = False
-                                    # Wild color choice
-                                    if played_card.special in ["Wild", "Wild Draw Four"]:
-                                        color = choose_color_popup()
-                                        game.wild_card_color_choice(0, color)
-                                    # Special cards
-                                    effect = game.special_cards(played_card)
-                                    if effect["Force Draw"]:
-                                        message = f"Bot draws {effect['Force Draw']} cards!"
-                                        game.force_draw_cards(100, effect["Force Draw"])
-                                    if effect["Skip"]:
-                                        message = "Bot's turn skipped!"
-                                        turn = 0
-                                        break
-                                    if not player.hand:
-                                        message = "You win!"
-                                        running = False
-                                        break
-                                    turn = 1
-                                    break
-                    # Draw from deck
-                    if DISCARD_X - 120 <= mx <= DISCARD_X - 120 + CARD_WIDTH and DISCARD_Y <= my <= DISCARD_Y + CARD_HEIGHT:
-                        if not game.deck:
-                            game.reshuffle_deck()
-                        if game.deck and not player_drawn_this_turn and not player_must_end_turn:
-                            drawn = game.deck.pop()
-                            player.draw_card(drawn)
-                            message = f"You drew: {drawn}"
-                            # If the drawn card is playable, allow to play it, else must end turn
-                            if drawn.is_playable_on(game.discard_pile[-1]):
-                                player_drawn_this_turn = True
-                                player_must_end_turn = True
-                            else:
-                                player_drawn_this_turn = True
-                                player_must_end_turn = True
-                                message += " (No playable move, end your turn)"
-            # No playable cards: must draw, but only once
-            if not playable and not player_drawn_this_turn and not player_must_end_turn and not message:
-                if not game.deck:
-                    game.reshuffle_deck()
-                if game.deck:
-                    drawn = game.deck.pop()
-                    player.draw_card(drawn)
-                    message = f"No playable cards. Drew: {drawn}"
-                    if drawn.is_playable_on(game.discard_pile[-1]):
-                        player_drawn_this_turn = True
-                        player_must_end_turn = True
+                                    renderer.invalidate()
+                                    result = game.step(COLOR_ACTIONS[COLOR_INDEX[color]])
+                                message = describe_effects(result)
+                            break
                     else:
-                        player_drawn_this_turn = True
-                        player_must_end_turn = True
-                        message += " (No playable move, end your turn)"
+                        # Draw from deck, which ends the turn
+                        if pygame.Rect(DECK_RECT).collidepoint(mx, my):
+                            result = game.step(DRAW_ACTION)
+                            message = f"You drew: {result['card']}" if result["card"] else "The deck is empty."
+                    if game.current_player != 0 or game.winner is not None:
+                        # Later clicks in the queue belong to the next turn
+                        break
         else:
-            # Bot's turn
-            pygame.time.wait(800)
-            top_card = game.discard_pile[-1]
-            if game.difficulty == 1:
-                chosen = Strategy.choose_random_card(bot.hand, top_card)
-            else:
-                chosen = Strategy.choose_with_priority(bot.hand, top_card)
-
-            if chosen:
-                bot.play_card(chosen)
-                game.discard_pile.append(chosen)
-                message = f"Bot played: {chosen}"
-                if chosen.special in ["Wild", "Wild Draw Four"]:
-                    game.wild_card_color_choice(100)
-                    message += f" (Color: {game.discard_pile[-1].color})"
-                effect = game.special_cards(chosen)
-                if effect["Force Draw"]:
-                    message = f"You draw {effect['Force Draw']} cards!"
-                    game.force_draw_cards(0, effect["Force Draw"])
-                if effect["Skip"]:
-                    message = "Your turn is skipped!"
-                    turn = 1
-                    continue
+            # Bot's turn: the decision runs on bot_worker while frames keep rendering
+            if not bot_worker.busy:
+                bot_worker.start(game, 100)
+                bot_started = pygame.time.get_ticks()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    bot_worker.cancel()
+                    running = False
+            if not running or pygame.time.get_ticks() - bot_started < BOT_DELAY_MS:
+                continue
+            ready, chosen = bot_worker.poll()
+            if not ready:
+                continue
+
+            result = game.player_turn(100, chosen)
+            if result["action"] == "draw":
+                message = "Bot drew a card."
             else:
-                if not game.deck:
-                    game.reshuffle_deck()
-                if game.deck:
-                    drawn = game.deck.pop()
-                    bot.draw_card(drawn)
-                    message = "Bot drew a card."
-            if not bot.hand:
-                message = "Bot wins!"
-                running = False
-            turn = 0
+                message = f"Bot played: {result['card']}"
+                if result["color"]:
+                    message += f" (Color: {result['color']})"
+                effects = describe_effects(result)
+                if effects:
+                    message += f" {effects}"
+
+    if game.winner == 0:
+        message = "You win!"
+    elif game.winner == 100:
+        message = "Bot wins!"
     # Game over
+    result_pos = (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2)
+    exit_text = "Press any key to exit..."
+    exit_pos = (SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT // 2 + 40)
+    renderer.render([
+        ("result", text_rect(message, *result_pos), message, lambda: draw_text(message, *result_pos)),
+        ("exit", text_rect(exit_text, *exit_pos), None, lambda: draw_text(exit_text, *exit_pos)),
+    ])
     while True:
-        draw_background()
-        draw_text(message, SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2)
-        draw_text("Press any key to exit...", SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT // 2 + 40)
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
-                pygame.quit()
-                sys.exit()
+        event = pygame.event.wait()
+        if event.type == pygame.QUIT or event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
+            pygame.quit()
+            sys.exit()
 
 if __name__ == "__main__":
-    main()
+    # Optional argument: bot difficulty (1 random, 2 priority, 3 Monte Carlo)
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2)
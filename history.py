@@ -0,0 +1,166 @@
+"""Append-only, columnar move log for Game.game_history.
+
+Each move is stored as small integer codes in array columns rather than a
+dict of strings:
+
+    player_id   seat id
+    action      index into ACTIONS
+    card        card id played, or NO_CARD for a draw
+    top_card    card id on top of the discard pile after the move
+    top_color   index into COLORS of a wild's chosen colour, or 4 if none
+    hand_size   cards left in the mover's hand
+
+Give GameHistory a sink (JsonlSink, NpzSink or ParquetSink) to write the log
+to disk every chunk_size moves and keep only the unwritten tail in memory.
+One sink can be shared by many games; rows are tagged with the game_id.
+"""
+import json
+import os
+from array import array
+
+ACTIONS = ("play", "draw")
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+NO_CARD = 255
+COLUMNS = {
+    "player_id": "H",
+    "action": "B",
+    "card": "B",
+    "top_card": "B",
+    "top_color": "B",
+    "hand_size": "B",
+}
+
+
+class GameHistory:
+    def __init__(self, sink=None, chunk_size=65536, game_id=0):
+        self.sink = sink
+        self.chunk_size = chunk_size
+        self.game_id = game_id
+        self.flushed = 0
+        self.columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+
+    def __len__(self):
+        """Moves logged so far, including any already written to the sink."""
+        return self.flushed + len(self.columns["action"])
+
+    def append(self, player_id, action, card, top_card, top_color, hand_size):
+        columns = self.columns
+        try:
+            columns["player_id"].append(player_id)
+            columns["action"].append(action)
+            columns["card"].append(card)
+            columns["top_card"].append(top_card)
+            columns["top_color"].append(top_color)
+            columns["hand_size"].append(hand_size)
+        except OverflowError:
+            # Columns are appended in COLUMNS order, so the first short one
+            # rejected the value; drop the partial row before reporting it.
+            rows = min(len(column) for column in columns.values())
+            name = next(name for name, column in columns.items() if len(column) == rows)
+            for column in columns.values():
+                del column[rows:]
+            value = dict(zip(COLUMNS, (player_id, action, card, top_card, top_color, hand_size)))[name]
+            raise ValueError(f"{name} {value} does not fit history column type {COLUMNS[name]!r}") from None
+        if self.sink is not None and len(columns["action"]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write the moves held in memory to the sink and drop them."""
+        rows = len(self.columns["action"])
+        if self.sink is None or not rows:
+            return
+        self.sink.write(self.game_id, self.columns)
+        self.flushed += rows
+        self.columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+
+    def records(self):
+        """The moves still in memory as the dicts Game used to log."""
+        from game_engine import CARDS, COLORS
+
+        columns = self.columns
+        for player_id, action, card, top_card, top_color, hand_size in zip(
+                columns["player_id"], columns["action"], columns["card"], columns["top_card"],
+                columns["top_color"], columns["hand_size"]):
+            yield {
+                "player_id": player_id,
+                "action": ACTIONS[action],
+                "card": None if card == NO_CARD else str(CARDS[card]),
+                "hand_size": hand_size,
+                "top_card": _top_label(CARDS[top_card], top_color, COLORS),
+            }
+
+    def to_frame(self):
+        """pandas DataFrame of the moves still in memory, with the same columns as the old dict log."""
+        import pandas as pd
+
+        return pd.DataFrame(list(self.records()),
+                            columns=["player_id", "action", "card", "hand_size", "top_card"])
+
+
+def _top_label(card, top_color, colors):
+    if card.special and top_color < len(colors):
+        return f"{card.special} ({colors[top_color]})"
+    return str(card)
+
+
+class JsonlSink:
+    """Appends one JSON line per chunk: {"game_id": ..., column: [codes], ...}."""
+
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def write(self, game_id, columns):
+        line = {"game_id": game_id}
+        line.update((name, column.tolist()) for name, column in columns.items())
+        self.file.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class NpzSink:
+    """Writes each chunk to directory/chunk-NNNNNN.npz, one array per column plus game_id."""
+
+    def __init__(self, directory):
+        import numpy as np
+
+        self.np = np
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.chunks = len([name for name in os.listdir(directory) if name.endswith(".npz")])
+
+    def write(self, game_id, columns):
+        np = self.np
+        arrays = {name: np.frombuffer(column, dtype=np.dtype(column.typecode)) for name, column in columns.items()}
+        arrays["game_id"] = np.full(len(columns["action"]), game_id, dtype=np.int64)
+        np.savez(os.path.join(self.directory, f"chunk-{self.chunks:06d}.npz"), **arrays)
+        self.chunks += 1
+
+    def close(self):
+        pass
+
+
+class ParquetSink:
+    """Appends each chunk as a row group of a Parquet file (needs pyarrow)."""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.path = path
+        self.writer = None
+        self.pq = pq
+
+    def write(self, game_id, columns):
+        pa = self.pa
+        table = pa.table({"game_id": pa.array([game_id] * len(columns["action"]), pa.int64()),
+                          **{name: pa.array(column.tolist(), pa.uint16() if column.typecode == "H" else pa.uint8())
+                             for name, column in columns.items()}})
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
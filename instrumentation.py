@@ -0,0 +1,121 @@
+"""Optional counters, timers and profiling for a Game.
+
+    metrics = Instrumentation(profiler="cprofile")
+    game = Game(instrumentation=metrics)
+    ...
+    metrics.snapshot()
+
+A Game without instrumentation only pays an `is not None` check at each
+instrumented point. cProfile and pstats are only imported when a profile runs.
+"""
+import io
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILERS = ("cprofile", "tracemalloc")
+
+
+class Instrumentation:
+    """Counters and timers filled in by Game, plus an optional per-game profiler.
+
+    profiler is None, "cprofile" or "tracemalloc". Game.game_setup starts it
+    and it stops when the game has a winner (or on Game.abandon()); the
+    result of the last finished profile is part of snapshot(), listing the
+    profile_top functions by cumulative time or allocation sites by size.
+    """
+
+    def __init__(self, profiler=None, profile_top=20):
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profiler!r}, expected one of {PROFILERS}")
+        self.profiler = profiler
+        self.profile_top = profile_top
+        self.counters = Counter()
+        self.timers = {}
+        self.profile = None
+        self._running = None
+        self._started_tracing = False
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def record(self, name, seconds):
+        """Add one timed call of `seconds` to the timer `name`."""
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def start_profile(self):
+        if self.profiler is None or self._running is not None:
+            return
+        if self.profiler == "cprofile":
+            import cProfile
+
+            self._running = cProfile.Profile()
+            self._running.enable()
+        else:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._running = tracemalloc.take_snapshot()
+
+    def stop_profile(self):
+        running, self._running = self._running, None
+        if running is None:
+            return
+        if self.profiler == "cprofile":
+            import pstats
+
+            running.disable()
+            out = io.StringIO()
+            stats = pstats.Stats(running, stream=out)
+            stats.sort_stats("cumulative").print_stats(self.profile_top)
+            self.profile = {"profiler": "cprofile", "seconds": stats.total_tt, "report": out.getvalue()}
+        else:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().compare_to(running, "lineno")[:self.profile_top]
+            self.profile = {
+                "profiler": "tracemalloc",
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [{"site": str(stat.traceback), "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                        for stat in top],
+            }
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.profile = None
+
+    def snapshot(self):
+        """Plain dict of everything recorded so far, ready for JSON."""
+        return {
+            "counters": dict(self.counters),
+            "timers": {
+                name: {
+                    "calls": calls,
+                    "total_s": total,
+                    "mean_ms": total / calls * 1000,
+                    "max_ms": longest * 1000,
+                }
+                for name, (calls, total, longest) in self.timers.items()
+            },
+            "profile": self.profile,
+        }
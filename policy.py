@@ -0,0 +1,193 @@
+"""Learned card-scoring policy: a small NumPy MLP trained on dataset.py shards.
+
+    python -m policy data/ -o models/policy.npz
+
+The model estimates the probability that the player wins the game after
+playing a candidate card, from features.state_features plus a description of
+the card. Strategy.choose_with_model scores every playable card in one batched
+forward pass, and PolicyModel.rollout_policy lets Monte Carlo rollouts follow
+the model instead of playing random cards.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from features import NUM_FEATURES, gamestate_features
+from game_engine import CARDS, COLORS, NUM_CARD_IDS, DRAW_ACTION
+
+DEFAULT_MODEL_PATH = os.path.join("models", "policy.npz")
+KINDS = (None, "Skip", "Reverse", "Draw Two", "Wild", "Wild Draw Four")
+
+
+def _card_attributes():
+    """Row per card id: colour one-hot (with a no-colour slot), kind one-hot, number / 9."""
+    table = np.zeros((NUM_CARD_IDS, len(COLORS) + 1 + len(KINDS) + 1), dtype=np.float32)
+    for card in CARDS:
+        table[card.id, COLORS.index(card.color) if card.color else len(COLORS)] = 1
+        table[card.id, len(COLORS) + 1 + KINDS.index(card.special)] = 1
+        if card.number is not None:
+            table[card.id, -1] = card.number / 9
+    return table
+
+
+CARD_ATTRIBUTES = _card_attributes()
+# Which colour slot each card id counts towards, to total a hand's cards per colour.
+_CARD_COLORS = CARD_ATTRIBUTES[:, :len(COLORS) + 1]
+_SCALES = np.array([10, 10, 1, 108], dtype=np.float32)
+INPUT_WIDTH = NUM_CARD_IDS + CARD_ATTRIBUTES.shape[1] + len(COLORS) + 1 + len(_SCALES) + CARD_ATTRIBUTES.shape[1] + 1
+
+
+def model_inputs(states, card_ids):
+    """Model input rows for (n, NUM_FEATURES) state features and the n candidate card ids."""
+    states = np.asarray(states)
+    card_ids = np.asarray(card_ids)
+    hand = states[:, :NUM_CARD_IDS].astype(np.float32)
+    candidate = CARD_ATTRIBUTES[card_ids]
+    color_counts = hand @ _CARD_COLORS
+    same_color = (color_counts * candidate[:, :len(COLORS) + 1]).sum(axis=1, keepdims=True) / 10
+    return np.concatenate([
+        hand,
+        CARD_ATTRIBUTES[states[:, NUM_CARD_IDS]],
+        np.eye(len(COLORS) + 1, dtype=np.float32)[states[:, NUM_CARD_IDS + 1]],
+        states[:, NUM_CARD_IDS + 2:NUM_FEATURES] / _SCALES,
+        candidate,
+        same_color,
+    ], axis=1, dtype=np.float32)
+
+
+class PolicyModel:
+    """MLP with ReLU hidden layers and a single logit output, as a list of (weights, bias) pairs."""
+
+    def __init__(self, layers):
+        self.layers = [(np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32)) for w, b in layers]
+        self._features = np.zeros(NUM_FEATURES, dtype=np.int16)
+
+    @classmethod
+    def initial(cls, hidden=(32,), seed=0):
+        rng = np.random.default_rng(seed)
+        sizes = [INPUT_WIDTH, *hidden, 1]
+        return cls([(rng.normal(0, np.sqrt(2 / n_in), (n_in, n_out)), np.zeros(n_out))
+                    for n_in, n_out in zip(sizes[:-1], sizes[1:])])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls([(data[f"w{i}"], data[f"b{i}"]) for i in range(len(data.files) // 2)])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {}
+        for i, (w, b) in enumerate(self.layers):
+            arrays[f"w{i}"] = w
+            arrays[f"b{i}"] = b
+        np.savez(path, **arrays)
+
+    def logits(self, x):
+        for w, b in self.layers[:-1]:
+            x = np.maximum(x @ w + b, 0)
+        w, b = self.layers[-1]
+        return (x @ w + b)[:, 0]
+
+    def predict(self, x):
+        """Win probability per input row."""
+        return 1 / (1 + np.exp(-self.logits(x)))
+
+    def score_cards(self, state, card_ids):
+        """Win probability for playing each of card_ids from one state_features vector."""
+        return self.predict(model_inputs(np.broadcast_to(state, (len(card_ids), NUM_FEATURES)), card_ids))
+
+    def rollout_policy(self, state, player_id, playable):
+        """Rollout policy for Monte Carlo (see Strategy.random_rollout): the best-scoring playable card id."""
+        features = gamestate_features(state, player_id, self._features)
+        return playable[int(self.logits(model_inputs(
+            np.broadcast_to(features, (len(playable), NUM_FEATURES)), playable)).argmax())]
+
+    def gradients(self, x, y):
+        """Mean binary cross-entropy of x against labels y, and its gradient per layer."""
+        activations = [x]
+        for w, b in self.layers[:-1]:
+            activations.append(np.maximum(activations[-1] @ w + b, 0))
+        w, b = self.layers[-1]
+        z = (activations[-1] @ w + b)[:, 0]
+        p = 1 / (1 + np.exp(-z))
+        loss = -np.mean(y * np.log(p + 1e-7) + (1 - y) * np.log(1 - p + 1e-7))
+
+        grads = []
+        delta = ((p - y) / len(y))[:, None].astype(np.float32)
+        for i in range(len(self.layers) - 1, -1, -1):
+            w, b = self.layers[i]
+            grads.append((activations[i].T @ delta, delta.sum(axis=0)))
+            if i:
+                delta = (delta @ w.T) * (activations[i] > 0)
+        return loss, grads[::-1]
+
+
+_MODELS = {}
+
+
+def load_policy(path=DEFAULT_MODEL_PATH):
+    """The PolicyModel saved at path, loaded once per process; None if there is no such file."""
+    if path not in _MODELS:
+        _MODELS[path] = PolicyModel.load(path) if os.path.exists(path) else None
+    return _MODELS[path]
+
+
+def train_policy(directory, hidden=(32,), epochs=2, batch_size=1024, learning_rate=1e-3, seed=0, log=None):
+    """Fit a PolicyModel with Adam on the card plays in a dataset.py directory.
+
+    Draws and unfinished games are skipped; the label is whether the player
+    who chose the card went on to win.
+    """
+    from dataset import load_shards
+
+    model = PolicyModel.initial(hidden, seed)
+    rng = np.random.default_rng(seed)
+    moments = [[np.zeros_like(p) for p in layer] for layer in model.layers]
+    squares = [[np.zeros_like(p) for p in layer] for layer in model.layers]
+    beta1, beta2 = 0.9, 0.999
+    t = 0
+    for epoch in range(epochs):
+        total, batches = 0.0, 0
+        for shard in load_shards(directory):
+            keep = np.flatnonzero((shard["action"] < DRAW_ACTION) & (shard["outcome"] != 0))
+            rng.shuffle(keep)
+            for start in range(0, len(keep), batch_size):
+                rows = shard[np.sort(keep[start:start + batch_size])]
+                loss, grads = model.gradients(model_inputs(rows["features"], rows["action"]),
+                                              (rows["outcome"] > 0).astype(np.float32))
+                t += 1
+                for layer, grad, m, v in zip(model.layers, grads, moments, squares):
+                    for j in range(2):
+                        m[j] = beta1 * m[j] + (1 - beta1) * grad[j]
+                        v[j] = beta2 * v[j] + (1 - beta2) * grad[j] ** 2
+                        step = learning_rate * (m[j] / (1 - beta1 ** t)) / (np.sqrt(v[j] / (1 - beta2 ** t)) + 1e-8)
+                        layer[j][...] -= step.astype(np.float32)
+                total += loss
+                batches += 1
+        if log:
+            log(f"epoch {epoch + 1}: loss {total / max(batches, 1):.4f}")
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the learned card policy on dataset.py shards.")
+    parser.add_argument("directory", help="dataset directory with manifest.json")
+    parser.add_argument("-o", "--output", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--hidden", type=int, nargs="*", default=[32], help="hidden layer sizes")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--learning-rate", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = train_policy(args.directory, tuple(args.hidden), args.epochs, args.batch_size, args.learning_rate,
+                         args.seed, log=print)
+    model.save(args.output)
+    print(f"saved {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
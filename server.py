@@ -0,0 +1,355 @@
+"""Asyncio server hosting many human-vs-bot UNO sessions in one process.
+
+    python -m server serve --port 8765 --workers 4
+    python -m server load --sessions 1000 --connections 50
+
+Clients speak JSON lines over TCP: one request object per line, answered by
+one reply per line, in order. Requests:
+
+    {"op": "new", "difficulty": 2, "seed": 1}   start a game; the client is player 0
+    {"op": "move", "session": 1, "action": 7}   a Game.step action (card id, DRAW_ACTION or a COLOR_ACTION)
+    {"op": "state", "session": 1}               the session's current state
+    {"op": "stats", "session": 1}               move latency percentiles (server-wide without "session")
+    {"op": "close", "session": 1}               end the session
+
+A session belongs to the connection that created it: other connections
+get "Unknown session" for it, and it is closed when that connection drops.
+
+Game replies carry the client's hand, the top card and colour, hand sizes,
+the legal actions, the winner, the moves played since the last reply
+("events") and the move's latency in milliseconds. Errors reply
+{"ok": false, "error": ...}.
+
+Bot turns run right after the client's move. Decisions for OFFLOADED
+difficulties are sent to a process pool as Game.to_bytes(), so a slow
+Monte Carlo turn in one session never stalls the others.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from game_engine import Game, CARDS, DECK_IDS, DRAW_ACTION
+
+HUMAN_ID = 0
+DIFFICULTIES = (1, 2, 3, 4)
+# Cards dealt to each of the two players; the deck must also leave a first discard.
+MAX_HAND_SIZE = (len(DECK_IDS) - 1) // 2
+# Bot difficulties whose decisions run in the process pool; the others take
+# microseconds and are made inline.
+OFFLOADED = (3,)
+# Recent move latencies kept per session, and for the whole server.
+LATENCY_WINDOW = 1000
+SERVER_LATENCY_WINDOW = 100_000
+
+
+def _latency(times):
+    """p50/p99/max of a sequence of seconds, in milliseconds."""
+    ordered = sorted(times)
+    if not ordered:
+        return {"moves": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "moves": len(ordered),
+        "p50_ms": ordered[int(0.50 * (len(ordered) - 1))] * 1000,
+        "p99_ms": ordered[int(0.99 * (len(ordered) - 1))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def _decide(data, player_id, difficulty, seed, options):
+    """Pool worker: the card id player_id's bot plays in an encoded game, or None to draw."""
+    card = Game.from_bytes(data, seed=seed, **options).choose_bot_card(player_id, difficulty)
+    return None if card is None else card.id
+
+
+def _event(result):
+    event = dict(result)
+    event["card"] = None if result["card"] is None else result["card"].id
+    return event
+
+
+class Session:
+    """One game, with a lock so its moves apply one at a time, and its recent move latencies."""
+
+    def __init__(self, session_id, game):
+        self.id = session_id
+        self.game = game
+        self.lock = asyncio.Lock()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+
+class GameServer:
+    """Game sessions for JSON-lines clients (see the module docstring for the protocol).
+
+    workers is the size of the process pool for OFFLOADED bot decisions;
+    with 0 they run inline and block the event loop. game_options are
+    passed to every Game (simulations, time_budget, rollout_depth, ...).
+    """
+
+    def __init__(self, workers=1, max_sessions=10_000, **game_options):
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+        self.max_sessions = max_sessions
+        self.game_options = game_options
+        self.sessions = {}
+        self.latencies = deque(maxlen=SERVER_LATENCY_WINDOW)
+        self.server = None
+        self._ids = itertools.count(1)
+        self._connections = {}  # handler task -> its writer
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Listen on host:port (0 picks a free port) and return the bound (host, port)."""
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Stop listening, end open connections once their current request is answered, and stop the pool."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        self._connections[asyncio.current_task()] = writer
+        owned = set()  # ids of the sessions this connection created
+        try:
+            while line := await reader.readline():
+                try:
+                    reply = await self.dispatch(json.loads(line), owned)
+                except Exception as error:
+                    # Bad requests, and anything unexpected, get an error reply
+                    # rather than dropping the connection.
+                    reply = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            del self._connections[asyncio.current_task()]
+            writer.close()
+
+    async def dispatch(self, request, owned):
+        """Answer one request from the connection owning the session ids in `owned`."""
+        if not isinstance(request, dict):
+            raise ValueError("A request must be a JSON object")
+        op = request.get("op")
+        if op == "new":
+            reply = await self.new_session(request.get("difficulty", 2), request.get("seed"),
+                                           request.get("hand_size", 7))
+            owned.add(reply["session"])
+            return reply
+        if op == "stats" and "session" not in request:
+            return {"ok": True, "sessions": len(self.sessions), **_latency(self.latencies)}
+        session_id = request.get("session")
+        session = self.sessions.get(session_id) if session_id in owned else None
+        if session is None:
+            raise ValueError(f"Unknown session {session_id!r}")
+        if op == "move":
+            return await self.move(session, request["action"])
+        if op == "state":
+            return self.reply(session, [])
+        if op == "stats":
+            return {"ok": True, "session": session.id, **_latency(session.latencies)}
+        if op == "close":
+            async with session.lock:
+                if self.sessions.pop(session.id, None) is None:
+                    raise ValueError(f"Session {session.id} is already closed")
+            owned.discard(session.id)
+            return {"ok": True, "session": session.id, **_latency(session.latencies)}
+        raise ValueError(f"Unknown op {op!r}")
+
+    async def new_session(self, difficulty, seed=None, hand_size=7):
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError(f"The server is full ({self.max_sessions} sessions)")
+        if type(difficulty) is not int or difficulty not in DIFFICULTIES:
+            raise ValueError(f"difficulty must be one of {list(DIFFICULTIES)}, got {difficulty!r}")
+        if type(hand_size) is not int or not 1 <= hand_size <= MAX_HAND_SIZE:
+            raise ValueError(f"hand_size must be 1 to {MAX_HAND_SIZE}, got {hand_size!r}")
+        if seed is not None and type(seed) is not int:
+            raise ValueError(f"seed must be an integer, got {seed!r}")
+        game = Game(difficulty=difficulty, seed=seed, **self.game_options)
+        game.game_setup(hand_size=hand_size)
+        session = Session(next(self._ids), game)
+        self.sessions[session.id] = session
+        async with session.lock:
+            events = await self.play_bots(session)
+        return self.reply(session, events)
+
+    async def move(self, session, action):
+        started = time.perf_counter()
+        async with session.lock:
+            if session.game.winner is None and session.game.current_player != HUMAN_ID:
+                raise ValueError(f"It is player {session.game.current_player}'s turn")
+            events = [_event(session.game.step(action))]
+            events += await self.play_bots(session)
+        elapsed = time.perf_counter() - started
+        session.latencies.append(elapsed)
+        self.latencies.append(elapsed)
+        return self.reply(session, events, elapsed)
+
+    async def play_bots(self, session):
+        """Play bot turns until it is the client's turn again or the game is over; return their events."""
+        game = session.game
+        events = []
+        while game.winner is None and game.current_player != HUMAN_ID:
+            player_id = game.current_player
+            difficulty = game.strategies[player_id]
+            if self.pool is not None and difficulty in OFFLOADED:
+                cid = await asyncio.get_running_loop().run_in_executor(
+                    self.pool, _decide, game.to_bytes(), player_id, difficulty, game.bot_rng.getrandbits(64),
+                    self.game_options)
+                card = None if cid is None else CARDS[cid]
+            else:
+                card = game.choose_bot_card(player_id)
+            events.append(_event(game.player_turn(player_id, card)))
+        return events
+
+    def reply(self, session, events, latency=None):
+        game = session.game
+        return {
+            "ok": True,
+            "session": session.id,
+            "hand": [card.id for card in game.players[HUMAN_ID].hand],
+            "top": game.discard_pile[-1].id,
+            "color": game.current_color(),
+            "seats": list(game.ring.seats),
+            "hand_sizes": [len(game.players[pid].hand) for pid in game.ring.seats],
+            "current_player": game.current_player,
+            "legal": [action for action, allowed in enumerate(game.legal_actions()) if allowed],
+            "winner": game.winner,
+            "events": events,
+            "latency_ms": None if latency is None else latency * 1000,
+        }
+
+
+class Client:
+    """JSON-lines client for GameServer, one request at a time."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765):
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, op, **fields):
+        """Send one request and return its reply; raises ValueError for an error reply."""
+        self.writer.write(json.dumps({"op": op, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        reply = json.loads(await self.reader.readline())
+        if not reply["ok"]:
+            raise ValueError(reply["error"])
+        return reply
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_load(host, port, sessions=100, connections=10, difficulty=2, max_moves=500, seed=0):
+    """Play `sessions` games over `connections` concurrent clients and return a summary.
+
+    Each client plays a random playable card, or draws when it has none.
+    Latencies are round trips measured by the clients.
+    """
+    games = iter(range(sessions))
+    latencies = []
+    finished = 0
+
+    async def play(connection):
+        nonlocal finished
+        client = await Client.connect(host, port)
+        rng = random.Random(seed * 1_000_003 + connection)
+        for game in games:
+            reply = await client.request("new", difficulty=difficulty, seed=seed + game)
+            for _ in range(max_moves):
+                if reply["winner"] is not None:
+                    finished += 1
+                    break
+                legal = reply["legal"]
+                action = rng.choice([a for a in legal if a != DRAW_ACTION] or legal)
+                started = time.perf_counter()
+                reply = await client.request("move", session=reply["session"], action=action)
+                latencies.append(time.perf_counter() - started)
+            await client.request("close", session=reply["session"])
+        await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(play(i) for i in range(connections)))
+    elapsed = time.perf_counter() - started
+    return {
+        "sessions": sessions,
+        "connections": connections,
+        "finished": finished,
+        "seconds": elapsed,
+        "moves_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        **_latency(latencies),
+    }
+
+
+async def _serve(args):
+    server = GameServer(args.workers, args.max_sessions, simulations=args.simulations, time_budget=args.time_budget)
+    host, port = await server.start(args.host, args.port)
+    print(f"serving on {host}:{port}")
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+async def _load(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        # No server given: start one in this process.
+        server = GameServer(args.workers, simulations=args.simulations, time_budget=args.time_budget)
+        host, port = await server.start(host)
+    try:
+        summary = await run_load(host, port, args.sessions, args.connections, args.difficulty, args.max_moves,
+                                 args.seed)
+    finally:
+        if server is not None:
+            await server.close()
+    print(json.dumps(summary, indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host UNO sessions over JSON lines, or generate load against them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the server")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--max-sessions", type=int, default=10_000)
+    load = commands.add_parser("load", help="play many sessions concurrently and report latency")
+    load.add_argument("--port", type=int, default=None, help="server to load (default: start one in-process)")
+    load.add_argument("--sessions", type=int, default=100)
+    load.add_argument("--connections", type=int, default=10)
+    load.add_argument("--difficulty", type=int, default=2)
+    load.add_argument("--max-moves", type=int, default=500, help="abandon sessions longer than this")
+    load.add_argument("--seed", type=int, default=0)
+    for command in (serve, load):
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                             help="processes for Monte Carlo bot decisions (0: decide inline)")
+        command.add_argument("--simulations", type=int, default=50, help="rollouts per card for Monte Carlo bots")
+        command.add_argument("--time-budget", type=float, default=None,
+                             help="seconds per Monte Carlo decision instead of a fixed simulation count")
+    args = parser.parse_args(argv)
+
+    asyncio.run(_serve(args) if args.command == "serve" else _load(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_engine import Game, EvaluationCache, DEFAULT_ROLLOUT_DEPTH, MIN_SEATS, MAX_SEATS
+
+# Strategy methods available to the tournament, keyed by the name used on the
+# command line and mapped to the Game difficulty that selects them.
+STRATEGIES = {
+    "random": 1,
+    "priority": 2,
+    "monte_carlo": 3,
+    "learned": 4,
+}
+
+SEATS = (0, 100)
+
+# Each worker process keeps one EvaluationCache for all the games it plays.
+_CACHE = None
+
+
+def play_game(strategy_a, strategy_b, seed=None, hand_size=7, simulations=50, max_turns=1000, a_first=True,
+              time_budget=None, rollout_engine="python", allocation="uniform", rollout_depth=DEFAULT_ROLLOUT_DEPTH,
+              cache=None, seats=2):
+    """Play one bot-vs-bot game and return (winner, turns).
+
+    With more than two seats strategy_a and strategy_b alternate around the
+    table. The winner is "a", "b", or None if the game hit max_turns.
+    """
+    player_ids = SEATS if seats == 2 else tuple(range(seats))
+    labels = {pid: "ab"[seat % 2] for seat, pid in enumerate(player_ids)}
+    table = {pid: STRATEGIES[strategy_a if label == "a" else strategy_b] for pid, label in labels.items()}
+    game = Game(simulations=simulations, time_budget=time_budget, rollout_engine=rollout_engine,
+                allocation=allocation, rollout_depth=rollout_depth, cache=cache, seed=seed, seats=table)
+    game.game_setup(hand_size=hand_size)
+    game.current_player = player_ids[0] if a_first else player_ids[1]
+
+    turns = 0
+    while game.winner is None and turns < max_turns:
+        game.bot_turn(game.current_player)
+        turns += 1
+    if game.winner is None:
+        game.abandon()
+
+    return labels.get(game.winner), turns
+
+
+def _worker_cache(cache_entries):
+    global _CACHE
+    if not cache_entries:
+        return None
+    if _CACHE is None or _CACHE.max_entries != cache_entries:
+        _CACHE = EvaluationCache(max_entries=cache_entries)
+    return _CACHE
+
+
+def _play_chunk(args):
+    (strategy_a, strategy_b, start, count, seed, hand_size, simulations, max_turns, time_budget, rollout_engine,
+     allocation, rollout_depth, cache_entries, seats) = args
+    cache = _worker_cache(cache_entries)
+    results = {"a": 0, "b": 0, None: 0, "turns": 0}
+    for i in range(start, start + count):
+        game_seed = None if seed is None else seed + i
+        # Alternate who opens so neither strategy gets the first-move edge.
+        winner, turns = play_game(strategy_a, strategy_b, game_seed, hand_size, simulations, max_turns,
+                                  a_first=i % 2 == 0, time_budget=time_budget, rollout_engine=rollout_engine,
+                                  allocation=allocation, rollout_depth=rollout_depth, cache=cache, seats=seats)
+        results[winner] += 1
+        results["turns"] += turns
+    return results
+
+
+def _add_chunks(totals, chunks):
+    for chunk in chunks:
+        for key in totals:
+            totals[key] += chunk[key]
+
+
+def run_tournament(strategy_a, strategy_b, games, workers=None, chunk_size=None, seed=None,
+                   hand_size=7, simulations=50, max_turns=1000, time_budget=None, rollout_engine="python",
+                   allocation="uniform", rollout_depth=DEFAULT_ROLLOUT_DEPTH, cache_entries=0, seats=2):
+    """Play games between two strategies across a process pool and return a summary dict.
+
+    With seats > 2 the strategies alternate around a larger table (see play_game).
+
+    cache_entries > 0 gives each worker process an EvaluationCache of that many
+    positions, shared by all the games it plays.
+    """
+    for name in (strategy_a, strategy_b):
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {name!r}, expected one of {sorted(STRATEGIES)}")
+    if time_budget is not None and (rollout_engine != "python" or allocation != "uniform"):
+        raise ValueError("time_budget only supports the python rollout engine with uniform allocation")
+
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        # A few chunks per worker keeps the pool balanced without paying
+        # per-game IPC overhead.
+        chunk_size = max(1, min(1000, games // (workers * 4) or 1))
+
+    tasks = []
+    for start in range(0, games, chunk_size):
+        count = min(chunk_size, games - start)
+        tasks.append((strategy_a, strategy_b, start, count, seed, hand_size, simulations, max_turns, time_budget,
+                      rollout_engine, allocation, rollout_depth, cache_entries, seats))
+
+    totals = {"a": 0, "b": 0, None: 0, "turns": 0}
+    started = time.perf_counter()
+    if workers == 1:
+        _add_chunks(totals, map(_play_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            _add_chunks(totals, pool.map(_play_chunk, tasks))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "strategy_a": strategy_a,
+        "strategy_b": strategy_b,
+        "games": games,
+        "seats": seats,
+        "workers": workers,
+        "wins_a": totals["a"],
+        "wins_b": totals["b"],
+        "unfinished": totals[None],
+        "win_rate_a": totals["a"] / games if games else 0.0,
+        "win_rate_b": totals["b"] / games if games else 0.0,
+        "avg_turns": totals["turns"] / games if games else 0.0,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else 0.0,
+    }
+
+
+def print_summary(summary):
+    print(f"{summary['strategy_a']} vs {summary['strategy_b']}: "
+          f"{summary['games']} games at {summary['seats']} seats on {summary['workers']} worker(s)")
+    print(f"  {summary['strategy_a']:>12} wins: {summary['wins_a']} ({summary['win_rate_a']:.1%})")
+    print(f"  {summary['strategy_b']:>12} wins: {summary['wins_b']} ({summary['win_rate_b']:.1%})")
+    if summary["unfinished"]:
+        print(f"  {'unfinished':>12}: {summary['unfinished']}")
+    print(f"  average game length: {summary['avg_turns']:.1f} turns")
+    print(f"  {summary['games_per_second']:.1f} games/second ({summary['seconds']:.2f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play headless bot-vs-bot UNO tournaments.")
+    parser.add_argument("strategy_a", choices=sorted(STRATEGIES))
+    parser.add_argument("strategy_b", choices=sorted(STRATEGIES))
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="games per task sent to a worker")
+    parser.add_argument("--seed", type=int, default=None, help="base seed; game i uses seed + i")
+    parser.add_argument("--hand-size", type=int, default=7)
+    parser.add_argument("--seats", type=int, default=2,
+                        help=f"players at the table ({MIN_SEATS}-{MAX_SEATS}), alternating the two strategies")
+    parser.add_argument("--simulations", type=int, default=50, help="rollouts per card for monte_carlo")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="seconds per monte_carlo decision instead of a fixed simulation count")
+    parser.add_argument("--rollout-engine", choices=["python", "numpy"], default="python",
+                        help="monte_carlo rollout implementation (numpy helps from a few hundred rollouts per "
+                             "decision)")
+    parser.add_argument("--allocation", choices=["uniform", "halving", "ucb"], default="uniform",
+                        help="how monte_carlo spreads rollouts over the playable cards")
+    parser.add_argument("--rollout-depth", type=int, default=DEFAULT_ROLLOUT_DEPTH,
+                        help="turns before a monte_carlo rollout is cut off and scored heuristically")
+    parser.add_argument("--cache-entries", type=int, default=0,
+                        help="positions each worker caches monte_carlo results for (0 disables the cache)")
+    parser.add_argument("--max-turns", type=int, default=1000, help="abandon games longer than this")
+    args = parser.parse_args(argv)
+    if args.time_budget is not None and (args.rollout_engine != "python" or args.allocation != "uniform"):
+        parser.error("--time-budget only supports --rollout-engine python with --allocation uniform")
+
+    summary = run_tournament(args.strategy_a, args.strategy_b, args.games, workers=args.workers,
+                             chunk_size=args.chunk_size, seed=args.seed, hand_size=args.hand_size,
+                             simulations=args.simulations, max_turns=args.max_turns,
+                             time_budget=args.time_budget, rollout_engine=args.rollout_engine,
+                             allocation=args.allocation, rollout_depth=args.rollout_depth,
+                             cache_entries=args.cache_entries, seats=args.seats)
+    print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
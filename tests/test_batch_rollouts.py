@@ -0,0 +1,60 @@
+import numpy as np
+from game_engine import Card, Game, Strategy, heuristic_evaluation, rollout_wins, NUMPY_MIN_BATCH
+from batch_rollouts import COLUMNS, _sample, batch_rollout_wins
+
+
+def test_sample_picks_counted_cards():
+	rng = np.random.default_rng(0)
+	counts = rng.integers(0, 3, (500, COLUMNS)).astype(np.uint8)
+	counts[:, 54:] = 0
+	counts[0] = 0
+	chosen, totals = _sample(counts, rng)
+	assert (totals == counts.sum(axis=1)).all()
+	assert (counts[np.arange(1, 500), chosen[1:]] > 0).all()
+
+
+def test_batch_rollout_wins():
+	game = Game(num_players=1)
+	game.game_setup()
+	game.discard_pile.append(Card(number=4, color="Green"))
+	game.players[100].hand = [Card(number=4, color="Red")]
+	# playing the last card wins every rollout
+	wins = batch_rollout_wins(game.snapshot(100), 100, [Card(number=4, color="Red").id], 50, rng=1)
+	assert wins.tolist() == [50]
+
+	game.players[100].hand = [Card(number=4, color="Red"), Card(special="Wild"), Card(number=1, color="Blue")]
+	wins = batch_rollout_wins(game.snapshot(100), 100, [c.id for c in game.players[100].hand[:2]], 100, rng=1)
+	assert wins.shape == (2,)
+	assert ((wins >= 0) & (wins <= 100)).all()
+
+
+def test_batch_rollout_depth_cutoff_matches_heuristic():
+	game = Game(num_players=1)
+	game.game_setup()
+	card = game.players[100].hand[0]
+	state = game.snapshot(100)
+	wins = batch_rollout_wins(state, 100, [card.id], 4, max_depth=0, rng=1)
+	after = state.clone()
+	after.hands[100].remove(card.id)
+	assert abs(wins[0] - 4 * heuristic_evaluation(after, 100)) < 1e-9
+
+
+def test_monte_carlo_numpy_engine():
+	game = Game(num_players=1, difficulty=3)
+	game.game_setup()
+	chosen = Strategy.monte_carlo_card(game, 100, simulations=NUMPY_MIN_BATCH, engine="numpy")
+	assert chosen is None or game.is_playable(chosen)
+
+
+def test_small_numpy_batches_use_the_python_engine(monkeypatch):
+	import batch_rollouts
+
+	def fail(*args, **kwargs):
+		raise AssertionError("small batch reached the numpy engine")
+
+	monkeypatch.setattr(batch_rollouts, "batch_rollout_wins", fail)
+	game = Game(num_players=1, difficulty=3, seed=2)
+	game.game_setup()
+	card_ids = [card.id for card in game.players[100].hand[:2]]
+	wins = rollout_wins(game.snapshot(100), 100, card_ids, 10, engine="numpy")
+	assert len(wins) == 2 and all(0 <= w <= 10 for w in wins)
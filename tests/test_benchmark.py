@@ -0,0 +1,44 @@
+import pytest
+from benchmark import run_benchmarks, compare
+
+
+def test_run_benchmarks_reports_metrics():
+	report = run_benchmarks(["create_deck", "strategies"])
+	assert report["results"]["create_deck"]["calls_per_second"] > 0
+	latency = report["results"]["strategies"]["choose_with_priority_hand7"]
+	assert 0 < latency["p50_ms"] <= latency["p99_ms"]
+	with pytest.raises(ValueError):
+		run_benchmarks(["nope"])
+
+
+def test_draw_hand_uses_sprite_cache():
+	frame = run_benchmarks(["draw_hand"])["results"]["draw_hand"]
+	if "skipped" in frame:
+		pytest.skip(frame["skipped"])
+	import gui_game
+	assert len(gui_game.sprites) >= 56
+	assert frame["p50_ms"] > 0
+
+
+def test_engine_import_skips_pandas():
+	startup = run_benchmarks(["startup"])["results"]["startup"]
+	assert startup["imports_pandas"] == 0
+	assert startup["import_ms"] > 0
+
+
+def test_compare_flags_regressions():
+	baseline = {"results": {"deck": {"calls_per_second": 100.0, "p50_ms": 1.0}}}
+	current = {"results": {"deck": {"calls_per_second": 80.0, "p50_ms": 0.5}}}
+	rows = {row["metric"]: row for row in compare(current, baseline, threshold=0.1)}
+	assert rows["deck.calls_per_second"]["regression"]
+	assert not rows["deck.p50_ms"]["regression"]
+	assert rows["deck.p50_ms"]["change"] == pytest.approx(0.5)
+
+
+def test_compare_flags_metrics_leaving_a_zero_baseline():
+	baseline = {"results": {"startup": {"imports_pandas": 0, "import_ms": 0.0}}}
+	current = {"results": {"startup": {"imports_pandas": 1, "import_ms": 0.0}}}
+	rows = {row["metric"]: row for row in compare(current, baseline, threshold=5.0)}
+	assert rows["startup.imports_pandas"]["regression"]
+	assert not rows["startup.import_ms"]["regression"]
+	assert rows["startup.import_ms"]["change"] == 0
@@ -0,0 +1,36 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from dataset import generate, load_shards, parse_mix, MANIFEST
+from features import NUM_FEATURES
+from game_engine import DRAW_ACTION
+
+
+def test_generate_writes_fixed_size_shards(tmp_path):
+	manifest = generate(tmp_path, shards=2, shard_rows=300, mix=parse_mix("random:1,priority:1"), workers=1)
+	assert [entry["file"] for entry in manifest["shards"]] == ["shard-000000.npy", "shard-000001.npy"]
+	assert json.loads((tmp_path / MANIFEST).read_text())["shards"] == manifest["shards"]
+
+	shards = list(load_shards(tmp_path))
+	assert [len(shard) for shard in shards] == [300, 300]
+	rows = shards[0]
+	assert isinstance(rows, np.memmap)
+	assert rows["features"].shape == (300, NUM_FEATURES)
+	assert ((rows["action"] >= 0) & (rows["action"] <= DRAW_ACTION)).all()
+	assert set(np.unique(rows["outcome"])) <= {-1, 0, 1}
+
+
+def test_generate_resumes_and_is_deterministic(tmp_path):
+	first, second = tmp_path / "a", tmp_path / "b"
+	generate(first, shards=1, shard_rows=200, seed=5, workers=1)
+	built = os.path.getmtime(first / "shard-000000.npy")
+	generate(first, shards=3, shard_rows=200, seed=5, workers=1)
+	assert os.path.getmtime(first / "shard-000000.npy") == built
+	generate(second, shards=3, shard_rows=200, seed=5, workers=1)
+	for a, b in zip(load_shards(first), load_shards(second)):
+		assert np.array_equal(a, b)
+
+	with pytest.raises(ValueError):
+		generate(first, shards=3, shard_rows=100, seed=5, workers=1)
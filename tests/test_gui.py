@@ -0,0 +1,55 @@
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+gui_game = pytest.importorskip("gui_game")
+
+
+def test_renderer_redraws_only_changed_layers():
+	renderer = gui_game.Renderer(gui_game.screen)
+	drawn = []
+	def layers(message):
+		return [
+			("deck", gui_game.DECK_RECT, None, lambda: drawn.append("deck")),
+			("message", gui_game.text_rect(message, *gui_game.MESSAGE_POS), message, lambda: drawn.append("message")),
+		]
+
+	assert renderer.render(layers("hi")) == [gui_game.screen.get_rect()]
+	assert renderer.render(layers("hi")) == []
+
+	drawn.clear()
+	dirty = renderer.render(layers("a much longer message"))
+	assert len(dirty) == 2
+	assert drawn.count("message") == 2
+
+	renderer.invalidate()
+	assert renderer.render(layers("a much longer message")) == [gui_game.screen.get_rect()]
+
+
+def _poll(worker, timeout=10):
+	deadline = time.time() + timeout
+	while time.time() < deadline:
+		ready, chosen = worker.poll()
+		if ready:
+			return chosen
+		time.sleep(0.01)
+	raise AssertionError("bot decision did not finish")
+
+
+def test_bot_worker_decides_in_background():
+	game = gui_game.Game(num_players=1, difficulty=3, simulations=5)
+	game.game_setup()
+	worker = gui_game.BotWorker()
+	worker.start(game, 100)
+	assert worker.busy
+	chosen = _poll(worker)
+	assert not worker.busy
+	assert chosen is None or game.is_playable(chosen)
+
+	worker.start(game, 100)
+	worker.cancel()
+	time.sleep(0.2)
+	assert worker.poll() == (False, None)
@@ -0,0 +1,62 @@
+import json
+import random
+
+import numpy as np
+import pytest
+from game_engine import Game
+from history import GameHistory, JsonlSink, NpzSink, NO_CARD
+
+
+def _play(history):
+	random.seed(2)
+	game = Game(num_players=1, difficulty=2, history=history)
+	game.game_setup()
+	while game.winner is None:
+		game.bot_turn(game.current_player)
+	return game
+
+
+def test_history_frame_matches_logged_moves():
+	game = _play(None)
+	frame = game.return_game_history()
+	assert len(frame) == len(game.game_history)
+	assert list(frame.columns) == ["player_id", "action", "card", "hand_size", "top_card"]
+	assert set(frame["action"]) <= {"play", "draw"}
+	assert frame["card"].isna().sum() == (frame["action"] == "draw").sum()
+	assert frame["hand_size"].iloc[-1] == 0
+
+
+def test_history_streams_chunks_to_jsonl(tmp_path):
+	path = tmp_path / "moves.jsonl"
+	sink = JsonlSink(path)
+	game = _play(GameHistory(sink, chunk_size=16, game_id=7))
+	history = game.game_history
+	history.flush()
+	sink.close()
+
+	chunks = [json.loads(line) for line in path.read_text().splitlines()]
+	assert all(chunk["game_id"] == 7 for chunk in chunks)
+	assert sum(len(chunk["action"]) for chunk in chunks) == len(history)
+	assert all(len(chunk["action"]) == 16 for chunk in chunks[:-1])
+	assert len(game.return_game_history()) == 0
+
+
+def test_history_rejects_out_of_range_values():
+	history = GameHistory()
+	history.append(100, 1, NO_CARD, 3, 4, 8)
+	with pytest.raises(ValueError, match="player_id 70000"):
+		history.append(70000, 1, NO_CARD, 3, 4, 8)
+	with pytest.raises(ValueError, match="hand_size 300"):
+		history.append(100, 1, NO_CARD, 3, 4, 300)
+	assert len(history) == 1
+	assert {len(column) for column in history.columns.values()} == {1}
+
+
+def test_history_streams_chunks_to_npz(tmp_path):
+	history = GameHistory(NpzSink(tmp_path), chunk_size=32)
+	history.append(100, 1, NO_CARD, 3, 4, 8)
+	history.flush()
+	chunk = np.load(tmp_path / "chunk-000000.npz")
+	assert chunk["player_id"].tolist() == [100]
+	assert chunk["card"].tolist() == [NO_CARD]
+	assert chunk["game_id"].tolist() == [0]
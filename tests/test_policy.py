@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+import pytest
+from dataset import generate
+from features import state_features
+from game_engine import Game, Strategy, PLAYABLE, rollout_wins
+from policy import PolicyModel, load_policy, model_inputs, train_policy, INPUT_WIDTH
+
+
+def _dealt_game(**options):
+	game = Game(num_players=1, **options)
+	game.game_setup()
+	return game
+
+
+def test_choose_with_model_falls_back_to_priority_without_a_model(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	assert load_policy() is None
+	game = _dealt_game()
+	player = game.players[100]
+	expected = Strategy.choose_with_priority(player.hand, game.discard_pile[-1], game.wild_color)
+	assert Strategy.choose_with_model(game, 100) == expected
+
+
+def test_trained_model_round_trips_and_picks_a_playable_card_quickly(tmp_path):
+	generate(tmp_path / "data", shards=1, shard_rows=2000, workers=1)
+	model = train_policy(tmp_path / "data", hidden=(8,), epochs=1)
+	model.save(str(tmp_path / "policy.npz"))
+	loaded = load_policy(str(tmp_path / "policy.npz"))
+	assert load_policy(str(tmp_path / "policy.npz")) is loaded
+
+	game = _dealt_game(difficulty=4, policy=loaded)
+	features = state_features(game, 100)
+	ids = [card.id for card in game.players[100].hand]
+	assert model_inputs(np.stack([features] * len(ids)), ids).shape == (len(ids), INPUT_WIDTH)
+	np.testing.assert_allclose(loaded.score_cards(features, ids), model.score_cards(features, ids), rtol=1e-6)
+
+	started = time.perf_counter()
+	for i in range(100):
+		card = game.choose_bot_card(100)
+	assert (time.perf_counter() - started) / 100 < 0.005
+	playable = PLAYABLE[game.top_key()]
+	assert card is None or playable[card.id]
+
+
+def test_model_can_drive_monte_carlo_rollouts():
+	model = PolicyModel.initial(hidden=(4,))
+	game = _dealt_game()
+	stats = Strategy.monte_carlo_stats(game, 100, simulations=3, policy=model.rollout_policy)
+	assert all(visits == 3 for wins, visits in stats.values())
+	with pytest.raises(ValueError):
+		rollout_wins(game.snapshot(100), 100, [game.players[100].hand[0].id], 1, engine="numpy",
+			policy=model.rollout_policy)
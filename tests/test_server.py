@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+from game_engine import DRAW_ACTION
+from server import GameServer, Client, run_load
+
+
+def _run(coroutine):
+	return asyncio.run(coroutine)
+
+
+def test_load_generator_plays_sessions_to_the_end():
+	async def scenario():
+		server = GameServer(workers=0)
+		host, port = await server.start()
+		try:
+			summary = await run_load(host, port, sessions=6, connections=3, difficulty=2)
+			client = await Client.connect(host, port)
+			stats = await client.request("stats")
+			await client.close()
+		finally:
+			await server.close()
+		return summary, stats
+
+	summary, stats = _run(scenario())
+	assert summary["finished"] == 6
+	assert summary["moves"] > 0 and summary["p99_ms"] >= summary["p50_ms"] > 0
+	assert stats["sessions"] == 0 and stats["moves"] == summary["moves"]
+
+
+def test_session_replies_and_errors():
+	async def scenario():
+		server = GameServer(workers=0)
+		host, port = await server.start()
+		client = await Client.connect(host, port)
+		try:
+			reply = await client.request("new", difficulty=1, seed=3)
+			assert reply["seats"] == [0, 100] and reply["current_player"] == 0
+			assert len(reply["hand"]) == 7 and DRAW_ACTION in reply["legal"]
+			moved = await client.request("move", session=reply["session"], action=DRAW_ACTION)
+			assert moved["events"][0]["action"] == "draw" and moved["latency_ms"] > 0
+			assert (await client.request("stats", session=reply["session"]))["moves"] == 1
+			with pytest.raises(ValueError):
+				await client.request("move", session=reply["session"], action=999)
+			with pytest.raises(ValueError):
+				await client.request("state", session=12345)
+			# The connection survives errors.
+			assert (await client.request("state", session=reply["session"]))["hand"] == moved["hand"]
+		finally:
+			await client.close()
+			await server.close()
+
+	_run(scenario())
+
+
+def test_bad_requests_get_error_replies():
+	async def scenario():
+		server = GameServer(workers=0)
+		host, port = await server.start()
+		client = await Client.connect(host, port)
+		try:
+			bad = ({"difficulty": 7}, {"difficulty": "2"}, {"hand_size": 60}, {"hand_size": 0}, {"seed": [1]})
+			for fields in bad:
+				with pytest.raises(ValueError):
+					await client.request("new", **fields)
+			for line in (b"[1, 2]\n", b"not json\n", b"{\"op\": \"state\", \"session\": [1]}\n"):
+				client.writer.write(line)
+				await client.writer.drain()
+				assert json.loads(await client.reader.readline())["ok"] is False
+			assert server.sessions == {}
+
+			reply = await client.request("new", difficulty=2, seed=5)
+			session = server.sessions[reply["session"]]
+			session.game.current_player = 100
+			with pytest.raises(ValueError, match="turn"):
+				await client.request("move", session=reply["session"], action=DRAW_ACTION)
+			assert session.game.current_player == 100
+			with pytest.raises(ValueError):
+				await client.request("move", session=reply["session"], action="draw")
+			session.game.current_player = 0
+			assert (await client.request("move", session=reply["session"], action=DRAW_ACTION))["ok"]
+		finally:
+			await client.close()
+			await server.close()
+
+	_run(scenario())
+
+
+def test_sessions_belong_to_their_connection():
+	async def scenario():
+		server = GameServer(workers=0)
+		host, port = await server.start()
+		owner, other = await Client.connect(host, port), await Client.connect(host, port)
+		try:
+			closed = (await owner.request("new", difficulty=1, seed=1))["session"]
+			kept = (await owner.request("new", difficulty=1, seed=2))["session"]
+			for op in ("state", "move", "close"):
+				with pytest.raises(ValueError, match="Unknown session"):
+					await other.request(op, session=kept, action=DRAW_ACTION)
+			assert (await owner.request("close", session=closed))["ok"]
+			with pytest.raises(ValueError, match="Unknown session"):
+				await owner.request("close", session=closed)
+			assert list(server.sessions) == [kept]
+
+			await owner.close()
+			for _ in range(100):
+				if not server.sessions:
+					break
+				await asyncio.sleep(0.01)
+			assert server.sessions == {}
+		finally:
+			await other.close()
+			await server.close()
+
+	_run(scenario())
+
+
+def test_monte_carlo_turns_do_not_block_other_sessions():
+	async def scenario():
+		server = GameServer(workers=1, time_budget=0.5)
+		host, port = await server.start()
+		slow, fast = await Client.connect(host, port), await Client.connect(host, port)
+		try:
+			thinking = await slow.request("new", difficulty=3, seed=1)
+			quick = await fast.request("new", difficulty=2, seed=1)
+			slow_move = asyncio.create_task(slow.request("move", session=thinking["session"], action=DRAW_ACTION))
+			await asyncio.sleep(0.05)
+			for turn in range(5):
+				if quick["winner"] is not None:
+					break
+				quick = await fast.request("move", session=quick["session"], action=DRAW_ACTION)
+			assert not slow_move.done()
+			result = await slow_move
+			assert result["current_player"] == 0 or result["winner"] is not None
+		finally:
+			await slow.close()
+			await fast.close()
+			await server.close()
+
+	_run(scenario())
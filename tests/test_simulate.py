@@ -0,0 +1,40 @@
+import pytest
+from game_engine import Game
+from simulate import play_game, run_tournament, main
+
+
+def test_play_game_finishes_with_winner():
+	winner, turns = play_game("random", "priority", seed=3)
+	assert winner in ("a", "b")
+	assert turns > 0
+
+
+def test_play_game_is_reproducible_with_seed():
+	assert play_game("random", "random", seed=11) == play_game("random", "random", seed=11)
+
+
+def test_run_tournament_summary():
+	summary = run_tournament("random", "priority", games=20, workers=1, seed=0)
+	assert summary["wins_a"] + summary["wins_b"] + summary["unfinished"] == 20
+	assert summary["avg_turns"] > 0
+	assert summary["games_per_second"] > 0
+
+
+def test_run_tournament_at_a_larger_table():
+	summary = run_tournament("random", "priority", games=6, workers=1, seed=0, seats=5)
+	assert summary["seats"] == 5
+	assert summary["wins_a"] + summary["wins_b"] + summary["unfinished"] == 6
+
+
+def test_run_tournament_rejects_unknown_strategy():
+	with pytest.raises(ValueError):
+		run_tournament("random", "nope", games=1, workers=1)
+
+
+def test_run_tournament_rejects_time_budget_with_adaptive_allocation():
+	with pytest.raises(ValueError):
+		run_tournament("random", "monte_carlo", games=1, workers=1, time_budget=0.1, allocation="halving")
+	with pytest.raises(ValueError):
+		Game(difficulty=3, time_budget=0.1, rollout_engine="numpy")
+	with pytest.raises(SystemExit):
+		main(["random", "monte_carlo", "--time-budget", "0.1", "--allocation", "ucb"])
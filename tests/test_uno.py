@@ -1,5 +1,14 @@
 import pytest
-from game_engine import Card, Player, Strategy, Game
+import copy
+import numpy as np
+import pickle
+import random
+import time
+from game_engine import Card, Player, Strategy, Game, CARDS, DECK_IDS, timed_rollouts, heuristic_evaluation, EvaluationCache
+from game_engine import _rollout_worker, DEFAULT_ROLLOUT_DEPTH
+from game_engine import DRAW_ACTION, COLOR_ACTIONS, NUM_ACTIONS, Hand, PLAYABLE, top_key, SeatingRing, MAX_SEATS
+from game_engine import CardTracker
+from instrumentation import Instrumentation
 
 
 def test_card_str_and_path():
@@ -35,6 +44,43 @@ def test_player_draw_and_play():
 	assert p.play_card(c) is None
 
 
+def test_hand_indexes_follow_draws_and_plays():
+	red7, blue7, skip, wild = Card(7, "Red"), Card(7, "Blue"), Card(special="Skip", color="Red"), Card(special="Wild")
+	hand = Hand([red7, blue7, red7, skip])
+	hand.append(wild)
+	hand.remove(red7)
+	assert hand == [blue7, red7, skip, wild]
+	assert red7 in hand and hand.count(red7) == 1 and Card(1, "Red") not in hand
+	assert hand.count_color("Red") == 2 and hand.count_color(None) == 1
+	assert hand.count_face(7) == 2 and hand.count_face("Skip") == 1
+	with pytest.raises(ValueError):
+		hand.remove(Card(1, "Red"))
+
+	hand.pop()
+	hand.extend([wild, wild])
+	del hand[0]
+	assert hand.count_color(None) == 2 and hand.count_face(7) == 1
+	assert pickle.loads(pickle.dumps(hand)).counts == hand.counts
+
+	p = Player(0)
+	p.hand = [red7]
+	assert isinstance(p.hand, Hand) and p.play_card(red7) is red7 and not p.hand
+
+
+def test_hand_playable_matches_a_scan():
+	rng = random.Random(3)
+	deck = [CARDS[cid] for cid in DECK_IDS]
+	for size in (3, 7, 30, 60):
+		cards = rng.sample(deck, size)
+		hand = Hand(cards)
+		for top in deck[:20]:
+			key = top_key(top, "Green")
+			expected = [card for card in cards if PLAYABLE[key][card.id]]
+			assert sorted(hand.playable(key), key=id) == sorted(expected, key=id)
+			assert set(hand.playable(key, distinct=True)) == set(expected)
+			assert hand.playable_mask(key) == bytes(1 if card in expected else 0 for card in CARDS)
+
+
 def test_choose_with_priority_prefers_number():
 	top = Card(number=4, color="Yellow")
 	hand = [Card(number=2, color="Yellow"), Card(number=9, color="Yellow"), Card(special="Skip", color="Yellow")]
@@ -76,5 +122,407 @@ def test_force_draw_and_specials():
 	assert len(game.players[game.current_player].hand) >= 1
 
 
+def test_cards_are_shared_flyweights():
+	card = Card(number=5, color="Red")
+	assert card is Card(number=5, color="Red")
+	assert card is CARDS[card.id]
+	assert copy.deepcopy(card) is card
+	assert pickle.loads(pickle.dumps(card)) is card
+	assert not hasattr(card, "__dict__")
+	assert len(CARDS) == 54 and len(DECK_IDS) == 108
+	with pytest.raises(ValueError):
+		Card(number=12, color="Red")
+	wild = Card(special="Wild")
+	with pytest.raises(AttributeError):
+		wild.color = "Red"
+	with pytest.raises(AttributeError):
+		del card.number
+	assert wild.color is None and str(wild) == "Wild" and card.number == 5
+
+
+def test_wild_color_override():
+	wild = Card(special="Wild")
+	red = Card(number=3, color="Red")
+	blue = Card(number=3, color="Blue")
+	assert red.is_playable_on(wild, "Red")
+	assert not blue.is_playable_on(wild, "Red")
+
+	game = Game()
+	game.discard_pile.append(wild)
+	game.wild_card_color_choice(0, "Blue")
+	assert game.current_color() == "Blue"
+	assert game.is_playable(blue) and not game.is_playable(red)
+	assert Strategy.choose_with_priority([red, blue], wild, game.wild_color) is blue
+	# the shared Wild card itself is never recoloured
+	assert wild.color is None
+
+
+def test_snapshot_clone_is_independent():
+	game = Game(num_players=1)
+	game.game_setup()
+	state = game.snapshot()
+	assert list(state.hands[0]) == [c.id for c in game.players[0].hand]
+	assert state.discard[-1] == game.discard_pile[-1].id
+
+	sim = state.clone()
+	sim.draw(0)
+	sim.play(100, sim.hands[100][0])
+	assert len(state.hands[0]) == 7 and len(state.hands[100]) == 7
+	assert len(state.deck) == len(game.deck)
+
+
+def test_monte_carlo_card_returns_playable_card():
+	game = Game(num_players=1, difficulty=3)
+	game.game_setup()
+	game.current_player = 100
+	top = Card(number=4, color="Green")
+	game.discard_pile.append(top)
+	game.players[100].hand = [Card(number=4, color="Red"), Card(number=1, color="Blue")]
+	chosen = Strategy.monte_carlo_card(game, 100, simulations=5)
+	assert chosen is Card(number=4, color="Red")
+
+
+def test_monte_carlo_time_budget():
+	game = Game(num_players=1, difficulty=3)
+	game.game_setup()
+	game.current_player = 100
+	hand = game.players[100].hand
+	playable = [c.id for c in hand if game.is_playable(c)] or [hand[0].id]
+	start = time.perf_counter()
+	wins, visits = timed_rollouts(game.snapshot(100), 100, playable, 0.05)
+	assert time.perf_counter() - start < 0.5
+	assert all(v > 0 for v in visits)
+	assert all(w <= v for w, v in zip(wins, visits))
+
+	chosen = Strategy.monte_carlo_card(game, 100, time_budget=0.02)
+	assert chosen is None or game.is_playable(chosen)
+
+
+def test_rollout_worker_started_after_deadline_adds_nothing():
+	game = Game(num_players=1, difficulty=3)
+	game.game_setup()
+	hand = game.players[100].hand
+	card_ids = [c.id for c in hand]
+	wins, visits = _rollout_worker(game.snapshot(100).to_bytes(), None, 100, card_ids, time.monotonic() - 1, 1,
+		DEFAULT_ROLLOUT_DEPTH, None, None)
+	assert wins == visits == [0] * len(card_ids)
+
+
+def _mc_game():
+	game = Game(num_players=1, difficulty=3)
+	game.game_setup()
+	game.discard_pile.append(Card(number=4, color="Green"))
+	game.players[100].hand = [Card(number=4, color="Red"), Card(number=1, color="Green"),
+		Card(special="Wild"), Card(number=7, color="Green"), Card(number=2, color="Blue")]
+	return game
+
+
+def test_monte_carlo_stats_uniform():
+	stats = Strategy.monte_carlo_stats(_mc_game(), 100, simulations=4)
+	assert len(stats) == 4
+	assert all(visits == 4 and 0 <= wins <= 4 for wins, visits in stats.values())
+
+
+def test_monte_carlo_adaptive_allocation():
+	random.seed(7)
+	for allocation in ("halving", "ucb"):
+		stats = Strategy.monte_carlo_stats(_mc_game(), 100, simulations=10, allocation=allocation)
+		visits = sorted(v for w, v in stats.values())
+		assert 0 < sum(visits) <= 40
+		assert visits[0] >= 1
+		assert visits[-1] > visits[0]
+		assert Strategy.monte_carlo_card(_mc_game(), 100, simulations=10, allocation=allocation) in stats
+	with pytest.raises(ValueError):
+		Strategy.monte_carlo_stats(_mc_game(), 100, allocation="nope")
+
+
+def test_depth_limited_rollout_uses_evaluation():
+	game = _mc_game()
+	state = game.snapshot(100)
+	assert Strategy.random_rollout(state.clone(), 100, max_depth=0, evaluate=lambda s, p: 0.25) == 0.25
+
+	# two cards ahead of the opponent and holding a wild scores above even
+	score = Strategy.random_rollout(state.clone(), 100, max_depth=0)
+	assert score == heuristic_evaluation(state, 100)
+	assert 0.5 < score < 1.0
+
+	stats = Strategy.monte_carlo_stats(game, 100, simulations=3, max_depth=5)
+	assert all(0.0 <= wins <= 3.0 for wins, visits in stats.values())
+
+
+def test_random_rollout_stops_on_empty_hand():
+	game = _mc_game()
+	state = game.snapshot(100)
+	for i in range(20):
+		score = Strategy.random_rollout(state.clone(), 100)
+		assert 0.0 <= score <= 1.0
+
+
+def test_evaluation_cache_reuses_and_tops_up():
+	cache = EvaluationCache()
+	game = _mc_game()
+	first = Strategy.monte_carlo_stats(game, 100, simulations=4, cache=cache)
+	assert cache.info()["misses"] == 1 and len(cache) == 1
+	assert all(visits == 4 for wins, visits in first.values())
+
+	# a fresh search of the same position adds to the cached rollouts
+	again = Strategy.monte_carlo_stats(game, 100, simulations=6, cache=cache)
+	assert cache.info()["hits"] == 1
+	assert all(visits == 6 for wins, visits in again.values())
+	halving = Strategy.monte_carlo_stats(game, 100, simulations=6, allocation="halving", cache=cache)
+	assert all(visits > 6 for wins, visits in halving.values())
+
+
+def test_evaluation_cache_evicts_least_recently_used():
+	cache = EvaluationCache(max_entries=2)
+	cache.put("a", {0: (1, 2)})
+	cache.put("b", {0: (1, 2)})
+	cache.get("a")
+	cache.put("c", {0: (1, 2)})
+	assert cache.get("b") is None
+	assert cache.get("a") == {0: (1, 2)}
+	assert cache.info()["evictions"] == 1
+
+	small = EvaluationCache(max_bytes=cache.bytes // 2)
+	small.put("a", {0: (1, 2)})
+	small.put("b", {0: (1, 2)})
+	assert len(small) == 1 and small.bytes <= small.max_bytes
+
+
+def _instrumented_game(metrics):
+	game = Game(num_players=1, difficulty=3, simulations=2, instrumentation=metrics)
+	game.game_setup()
+	while game.winner is None:
+		game.bot_turn(game.current_player)
+	return game
+
+
+def test_instrumentation_counts_and_times_turns():
+	metrics = Instrumentation()
+	game = _instrumented_game(metrics)
+	snap = metrics.snapshot()
+	counters = snap["counters"]
+	assert counters["turns"] == len(game.game_history)
+	played = sum(n for name, n in counters.items() if name.startswith("played."))
+	assert played + counters.get("draws", 0) == counters["turns"]
+	assert counters["rollouts"] > 0
+	assert snap["timers"]["bot_turn"]["calls"] == counters["turns"]
+	assert snap["timers"]["decision.monte_carlo"]["calls"] == counters["turns"]
+	assert snap["profile"] is None
+
+
+def test_instrumentation_profilers():
+	for profiler in ("cprofile", "tracemalloc"):
+		metrics = Instrumentation(profiler=profiler, profile_top=5)
+		_instrumented_game(metrics)
+		assert metrics.snapshot()["profile"]["profiler"] == profiler
+	with pytest.raises(ValueError):
+		Instrumentation(profiler="nope")
+
+
+def test_abandoned_game_stops_its_profile():
+	metrics = Instrumentation(profiler="cprofile", profile_top=5)
+	for seed in (1, 2):
+		game = Game(num_players=1, instrumentation=metrics, seed=seed)
+		game.game_setup()
+		game.step(DRAW_ACTION)
+		game.abandon()
+		# Each game gets its own profile rather than the first one never stopping.
+		assert metrics.profile is not None and metrics._running is None
+		metrics.profile = None
+
+
+def _step_game(top, hand):
+	game = Game(num_players=1)
+	game.game_setup()
+	game.discard_pile.append(top)
+	game.players[0].hand = list(hand)
+	game.current_player = 0
+	return game
+
+
+def test_legal_actions_mask():
+	red5, blue5, green2 = Card(number=5, color="Red"), Card(number=5, color="Blue"), Card(number=2, color="Green")
+	game = _step_game(Card(number=3, color="Red"), [red5, blue5, green2])
+	mask = game.legal_actions()
+	assert len(mask) == NUM_ACTIONS
+	assert [i for i, legal in enumerate(mask) if legal] == [red5.id, DRAW_ACTION]
+	with pytest.raises(ValueError):
+		game.step(green2.id)
+	for action in ("draw", 1.5, None):
+		with pytest.raises(ValueError):
+			game.step(action)
+	# RL agents pick actions as NumPy integers.
+	result = game.step(np.flatnonzero(np.frombuffer(mask, dtype=np.uint8))[0])
+	assert result["action"] == "play" and result["card"] is red5
+
+
+def test_step_skip_reverse_and_draw_two_skip_the_opponent():
+	filler = Card(number=9, color="Yellow")
+	for special in ("Skip", "Reverse", "Draw Two"):
+		card = Card(special=special, color="Red")
+		game = _step_game(Card(number=3, color="Red"), [card, filler])
+		bot_cards = len(game.players[100].hand)
+		result = game.step(card.id)
+		assert result["skipped"] == 100
+		assert game.current_player == 0
+		assert len(game.players[100].hand) == bot_cards + (2 if special == "Draw Two" else 0)
+
+
+def test_step_wild_waits_for_color():
+	wild4 = Card(special="Wild Draw Four")
+	game = _step_game(Card(number=3, color="Red"), [wild4, Card(number=9, color="Yellow")])
+	bot_cards = len(game.players[100].hand)
+	game.step(wild4.id)
+	assert game.current_player == 0 and game.pending_color == 0
+	assert [i for i, legal in enumerate(game.legal_actions()) if legal] == list(COLOR_ACTIONS)
+	result = game.step(COLOR_ACTIONS[2])
+	assert result["color"] == "Blue" and game.current_color() == "Blue"
+	assert len(game.players[100].hand) == bot_cards + 4
+	assert game.current_player == 0
+
+
+def test_step_plays_whole_game_from_legal_actions():
+	random.seed(4)
+	game = Game(num_players=1)
+	game.game_setup()
+	steps = 0
+	while game.winner is None and steps < 5000:
+		mask = game.legal_actions()
+		game.step(random.choice([i for i, legal in enumerate(mask) if legal]))
+		steps += 1
+	assert game.winner in (0, 100)
+	assert not game.players[game.winner].hand
+	assert not any(game.legal_actions())
+	with pytest.raises(ValueError):
+		game.step(DRAW_ACTION)
+
+
+def _seeded_moves(seed, difficulty, simulations=5):
+	game = Game(num_players=1, difficulty=difficulty, simulations=simulations, seed=seed)
+	game.game_setup()
+	for turn in range(40):
+		if game.winner is not None:
+			break
+		game.bot_turn(game.current_player)
+	return game, list(game.game_history.records())
+
+
+def test_seeded_games_replay_exactly():
+	random.seed(1)
+	game, moves = _seeded_moves(42, 1)
+	random.seed(2)
+	assert _seeded_moves(game.seed, 1)[1] == moves
+	assert _seeded_moves(43, 1)[1] != moves
+	assert Game(seed=None).seed != Game(seed=None).seed
+
+
+def test_rng_streams_are_independent():
+	# More rollouts consume more of the rollout stream but must not change the deck.
+	few, many = Game(seed=5), Game(seed=5)
+	few.game_setup()
+	many.game_setup()
+	Strategy.monte_carlo_stats(few, 100, simulations=1)
+	Strategy.monte_carlo_stats(many, 100, simulations=20)
+	assert few.deck == many.deck
+	assert few.bot_rng.random() == many.bot_rng.random()
+	assert few.rollout_rng.random() != many.rollout_rng.random()
+
+
+def test_seating_ring_advances_skips_and_reverses():
+	ring = SeatingRing([0, 5, 7, 9])
+	assert ring.current == 0 and ring.peek() == 5
+	assert ring.advance() == 5 and ring.advance(2) == 9
+	ring.reverse()
+	assert ring.peek() == 7 and ring.advance(2) == 5
+	ring.move_to(0)
+	assert ring.advance() == 9
+	with pytest.raises(ValueError):
+		ring.move_to(100)
+
+
+def test_large_mixed_table_plays_to_a_winner():
+	seats = {pid: (pid % 3) or None for pid in range(MAX_SEATS)}
+	game = Game(seats=seats, seed=8)
+	assert game.num_players == 4 and list(game.players) == list(range(MAX_SEATS))
+	game.game_setup()
+	game.current_player = 3
+	reverse = Card(special="Reverse", color="Red")
+	game.players[3].hand.append(reverse)
+	game.discard_pile.append(Card(number=1, color="Red"))
+	game.step(reverse.id)
+	assert game.play_direction == -1 and game.current_player == 2
+	for turn in range(5000):
+		if game.winner is not None:
+			break
+		game.bot_turn(game.current_player, difficulty=seats[game.current_player] or 2)
+	assert game.winner in seats
+	with pytest.raises(ValueError):
+		Game(seats={0: None})
+	with pytest.raises(ValueError):
+		Game(seats={0: 9, 1: 2})
+	with pytest.raises(ValueError):
+		Game(difficulty=7)
+	with pytest.raises(ValueError):
+		game.choose_bot_card(0, difficulty=9)
+
+
+def test_game_to_bytes_round_trip():
+	game = Game(seats={0: None, 1: 2, 7: 3}, seed=4)
+	game.game_setup()
+	game.current_player = 1
+	game.play_direction = -1
+	wild = Card(special="Wild")
+	game.players[1].hand.append(wild)
+	game.step(wild.id)
+	data = game.to_bytes()
+	assert len(data) < 200 < len(pickle.dumps(game))
+
+	restored = Game.from_bytes(data, simulations=5)
+	assert restored.to_bytes() == data
+	assert restored.strategies == {1: 2, 7: 3} and restored.simulations == 5
+	assert restored.current_player == 1 and restored.play_direction == -1 and restored.pending_color == 1
+	assert restored.players[7].hand == game.players[7].hand
+	assert restored.deck == game.deck and restored.discard_pile == game.discard_pile
+	assert restored.legal_actions() == game.legal_actions()
+
+	state = game.snapshot(7)
+	copy_ = type(state).from_bytes(state.to_bytes())
+	assert copy_.player_ids == state.player_ids and copy_.current_player == 7
+	assert copy_.hands == state.hands and copy_.deck == state.deck and copy_.discard == state.discard
+	with pytest.raises(ValueError):
+		Game.from_bytes(data[:-1])
+
+
+def test_determinized_worlds_only_use_unseen_cards():
+	game = Game(seats={0: 2, 1: 2, 2: 2}, seed=6)
+	game.game_setup()
+	for turn in range(40):
+		if game.winner is None:
+			game.bot_turn(game.current_player)
+	state = game.determinized(1)
+	hidden = sorted(card.id for pid in (0, 2) for card in game.players[pid].hand) + sorted(c.id for c in game.deck)
+	assert sorted(state.unseen) == sorted(hidden)
+	worlds = [state.clone() for i in range(10)]
+	for world in worlds:
+		assert list(world.hands[1]) == list(game.players[1].hand.ids())
+		assert [len(world.hands[pid]) for pid in (0, 2)] == [len(game.players[pid].hand) for pid in (0, 2)]
+		assert sorted([*world.hands[0], *world.hands[2], *world.deck]) == sorted(state.unseen)
+	assert len({bytes(world.hands[0]) for world in worlds}) > 1
+	stats = Strategy.monte_carlo_stats(game, game.current_player, simulations=3)
+	assert all(visits == 3 for wins, visits in stats.values())
+
+
+def test_card_tracker_follows_reshuffles():
+	tracker = CardTracker()
+	pile = [CARDS[3], CARDS[3], CARDS[52]]
+	assert tracker.update(pile)[3] == 2
+	pile.append(CARDS[52])
+	assert tracker.update(pile)[52] == 2
+	hand = Hand([CARDS[3]])
+	unseen = tracker.unseen([CARDS[52]], hand)
+	assert len(unseen) == len(DECK_IDS) - 2 and 52 in unseen
+
+
 if __name__ == "__main__":
 	pytest.main(["-q", "test_uno.py"])
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from game_engine import NUM_ACTIONS, NUM_CARD_IDS, DRAW_ACTION
+from vector_env import UnoVectorEnv, random_actions
+
+
+def _run(env, steps):
+	obs = env.reset()
+	rng = np.random.default_rng(0)
+	finished = 0
+	for _ in range(steps):
+		obs, rewards, dones = env.step(random_actions(obs["legal"], rng))
+		finished += dones.sum()
+		assert set(rewards[~dones].tolist()) <= {0.0}
+		assert set(rewards[dones].tolist()) <= {-1.0, 0.0, 1.0}
+	return obs, finished
+
+
+def test_vector_env_observations_and_auto_reset():
+	env = UnoVectorEnv(8, seed=1, max_turns=40)
+	obs = env.reset()
+	assert obs["hand"].shape == (8, NUM_CARD_IDS)
+	assert obs["legal"].shape == (8, NUM_ACTIONS)
+	assert (obs["hand"].sum(axis=1) == 7).all()
+	assert (obs["opponent"] == 7).all()
+	assert obs["legal"][:, DRAW_ACTION].all()
+
+	obs, finished = _run(env, 60)
+	assert finished >= 8
+	assert (obs["hand"].sum(axis=1) > 0).all()
+
+
+def test_vector_env_rejects_illegal_actions():
+	env = UnoVectorEnv(2, seed=1)
+	obs = env.reset()
+	illegal = np.argmin(obs["legal"], axis=1)
+	with pytest.raises(ValueError):
+		env.step(illegal)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_vector_env_illegal_action_leaves_batch_untouched(workers):
+	env = UnoVectorEnv(4, seed=1, workers=workers)
+	try:
+		obs = env.reset()
+		actions = random_actions(obs["legal"], np.random.default_rng(0))
+		actions[-1] = np.argmin(obs["legal"][-1])
+		with pytest.raises(ValueError, match="game 3"):
+			env.step(actions)
+		if workers == 1:
+			assert (env.turns == 0).all()
+		obs_after, rewards, dones = env.step(random_actions(obs["legal"], np.random.default_rng(0)))
+		assert obs_after["hand"].shape == (4, NUM_CARD_IDS)
+	finally:
+		env.close()
+
+
+def test_vector_env_subprocess_shards():
+	env = UnoVectorEnv(5, seed=3, workers=2, max_turns=40)
+	try:
+		obs, finished = _run(env, 50)
+		assert obs["hand"].shape == (5, NUM_CARD_IDS)
+		assert finished >= 5
+	finally:
+		env.close()
@@ -0,0 +1,200 @@
+"""Batch of independent UNO games for reinforcement-learning self-play.
+
+    env = UnoVectorEnv(num_envs=256, opponent=2, workers=4)
+    obs = env.reset()
+    while training:
+        obs, rewards, dones = env.step(actions)   # actions: (num_envs,) ints
+    env.close()
+
+The agent plays seat 0 of every game through Game.step; after each agent
+action the opponent (a bot of the given difficulty at seat 100) moves until it
+is the agent's turn again. Observations are a dict of NumPy arrays with one
+row per game:
+
+    hand        (N, NUM_CARD_IDS) uint8  count of each card id in the agent's hand
+    top_card    (N,) int16               card id on the discard pile
+    color       (N,) int8                active colour index, NO_COLOR before a wild's colour is chosen
+    opponent    (N,) int16               cards in the opponent's hand
+    direction   (N,) int8                Game.play_direction
+    legal       (N, NUM_ACTIONS) uint8   Game.legal_actions() mask
+
+Rewards are +1 for an agent win, -1 for a loss and 0 otherwise. A finished
+game (won, or cut off at max_turns agent actions) is reset immediately, so
+the observation returned for it is the first one of the next game.
+
+With workers > 1 the games are split across that many subprocesses, each
+running its own UnoVectorEnv, and the results are concatenated.
+"""
+import multiprocessing
+import random
+
+import numpy as np
+
+from game_engine import Game, COLOR_INDEX, NO_COLOR, NUM_ACTIONS, NUM_CARD_IDS
+
+AGENT = 0
+OPPONENT = 100
+
+
+class UnoVectorEnv:
+    def __init__(self, num_envs, opponent=2, hand_size=7, max_turns=500, seed=None, workers=1):
+        self.num_envs = num_envs
+        self.opponent = opponent
+        self.hand_size = hand_size
+        self.max_turns = max_turns
+        self.workers = max(1, min(workers, num_envs))
+        self._shards = []
+        self._processes = []
+        if self.workers > 1:
+            # The shards' latest legal masks, so step() can check a batch
+            # before any shard applies it.
+            self._legal = np.zeros((num_envs, NUM_ACTIONS), dtype=np.uint8)
+            self._start_shards(seed)
+            return
+
+        # Each game gets its own seed from this stream (see Game's RNG_STREAMS).
+        self.rng = random.Random(seed)
+        self.games = [None] * num_envs
+        self.turns = np.zeros(num_envs, dtype=np.int32)
+        self.obs = {
+            "hand": np.zeros((num_envs, NUM_CARD_IDS), dtype=np.uint8),
+            "top_card": np.zeros(num_envs, dtype=np.int16),
+            "color": np.zeros(num_envs, dtype=np.int8),
+            "opponent": np.zeros(num_envs, dtype=np.int16),
+            "direction": np.zeros(num_envs, dtype=np.int8),
+            "legal": np.zeros((num_envs, NUM_ACTIONS), dtype=np.uint8),
+        }
+
+    def reset(self):
+        """Start a new game in every slot and return the observations."""
+        if self._shards:
+            for conn in self._shards:
+                conn.send(("reset", None))
+            obs = _concat_obs([_receive(conn) for conn in self._shards])
+            self._legal = obs["legal"]
+            return obs
+        for i in range(self.num_envs):
+            self._reset_game(i)
+        return self._copy_obs()
+
+    def step(self, actions):
+        """Apply one action per game and return (obs, rewards, dones).
+
+        Raises ValueError if an action is not allowed by that game's legal
+        mask; every action is checked before any game moves.
+        """
+        actions = np.asarray(actions)
+        if self._shards:
+            _check_actions(actions, self._legal)
+            bounds = np.cumsum([0] + self._shard_sizes)
+            for conn, start, end in zip(self._shards, bounds[:-1], bounds[1:]):
+                conn.send(("step", actions[start:end]))
+            results = [_receive(conn) for conn in self._shards]
+            obs = _concat_obs([obs for obs, rewards, dones in results])
+            self._legal = obs["legal"]
+            return (obs,
+                    np.concatenate([rewards for obs, rewards, dones in results]),
+                    np.concatenate([dones for obs, rewards, dones in results]))
+
+        _check_actions(actions, self.obs["legal"])
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        for i, action in enumerate(actions.tolist()):
+            game = self.games[i]
+            game.step(action)
+            while game.winner is None and game.current_player != AGENT:
+                game.bot_turn(game.current_player, difficulty=self.opponent)
+            self.turns[i] += 1
+            if game.winner is not None or self.turns[i] >= self.max_turns:
+                if game.winner is not None:
+                    rewards[i] = 1.0 if game.winner == AGENT else -1.0
+                else:
+                    game.abandon()
+                dones[i] = True
+                self._reset_game(i)
+            else:
+                self._write_obs(i)
+        return self._copy_obs(), rewards, dones
+
+    def close(self):
+        for conn in self._shards:
+            conn.send(("close", None))
+        for process in self._processes:
+            process.join()
+        self._shards = []
+
+    def _reset_game(self, i):
+        game = Game(num_players=1, difficulty=self.opponent, seed=self.rng.getrandbits(64))
+        game.game_setup(hand_size=self.hand_size)
+        game.current_player = AGENT
+        self.games[i] = game
+        self.turns[i] = 0
+        self._write_obs(i)
+
+    def _write_obs(self, i):
+        game = self.games[i]
+        obs = self.obs
+        obs["hand"][i] = np.frombuffer(game.players[AGENT].hand.counts, dtype=np.uint8)
+        obs["top_card"][i] = game.discard_pile[-1].id
+        obs["color"][i] = COLOR_INDEX.get(game.current_color(), NO_COLOR)
+        obs["opponent"][i] = len(game.players[OPPONENT].hand)
+        obs["direction"][i] = game.play_direction
+        obs["legal"][i] = np.frombuffer(game.legal_actions(), dtype=np.uint8)
+
+    def _copy_obs(self):
+        return {name: array.copy() for name, array in self.obs.items()}
+
+    def _start_shards(self, seed):
+        self._shard_sizes = [len(part) for part in np.array_split(np.arange(self.num_envs), self.workers)]
+        options = {"opponent": self.opponent, "hand_size": self.hand_size, "max_turns": self.max_turns}
+        for shard, size in enumerate(self._shard_sizes):
+            parent, child = multiprocessing.Pipe()
+            shard_seed = None if seed is None else seed + shard
+            process = multiprocessing.Process(target=_shard_worker, args=(child, size, shard_seed, options),
+                                              daemon=True)
+            process.start()
+            child.close()
+            self._shards.append(parent)
+            self._processes.append(process)
+
+
+def _shard_worker(conn, num_envs, seed, options):
+    env = UnoVectorEnv(num_envs, seed=seed, **options)
+    while True:
+        command, data = conn.recv()
+        if command == "close":
+            break
+        try:
+            conn.send(env.reset() if command == "reset" else env.step(data))
+        except Exception as exc:
+            conn.send(exc)
+    conn.close()
+
+
+def _receive(conn):
+    result = conn.recv()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def _check_actions(actions, legal):
+    if actions.shape != legal.shape[:1]:
+        raise ValueError(f"Expected {legal.shape[0]} actions, got an array of shape {actions.shape}")
+    if not np.issubdtype(actions.dtype, np.integer):
+        raise ValueError(f"Actions must be integers, got {actions.dtype}")
+    allowed = (actions >= 0) & (actions < legal.shape[1])
+    allowed[allowed] = legal[allowed.nonzero()[0], actions[allowed]] != 0
+    if not allowed.all():
+        i = int(np.argmin(allowed))
+        raise ValueError(f"Action {actions[i]} is not legal in game {i}")
+
+
+def _concat_obs(parts):
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def random_actions(legal, rng):
+    """One uniformly random legal action per row of a (N, NUM_ACTIONS) legal mask."""
+    return (rng.random(legal.shape) * legal).argmax(axis=1)